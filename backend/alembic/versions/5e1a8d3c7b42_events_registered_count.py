@@ -0,0 +1,43 @@
+"""events registered_count
+
+Revision ID: 5e1a8d3c7b42
+Revises: 9c5d1f7a3e28
+Create Date: 2025-11-26 10:05:17.402815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a8d3c7b42'
+down_revision: Union[str, Sequence[str], None] = '9c5d1f7a3e28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'events',
+        sa.Column('registered_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE events e
+        SET registered_count = p.n
+        FROM (
+            SELECT event_id, count(*) AS n
+            FROM participants
+            GROUP BY event_id
+        ) p
+        WHERE p.event_id = e.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'registered_count')
@@ -0,0 +1,67 @@
+"""participants unique event user
+
+Revision ID: 7a2f4c6e1d95
+Revises: 5e1a8d3c7b42
+Create Date: 2025-11-26 15:41:09.218334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2f4c6e1d95'
+down_revision: Union[str, Sequence[str], None] = '5e1a8d3c7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep one row per (event_id, user_id): the one with a role, then the
+    # earliest registration. Attendance of the dropped rows moves to it.
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE participant_dupes ON COMMIT DROP AS
+        SELECT id, keep_id
+        FROM (
+            SELECT id,
+                   first_value(id) OVER w AS keep_id
+            FROM participants
+            WINDOW w AS (
+                PARTITION BY event_id, user_id
+                ORDER BY role_id IS NULL, registered_at, id
+            )
+        ) ranked
+        WHERE id <> keep_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE attendances a
+        SET participant_id = d.keep_id
+        FROM participant_dupes d
+        WHERE a.participant_id = d.id
+        """
+    )
+    op.execute("DELETE FROM participants p USING participant_dupes d WHERE p.id = d.id")
+    op.execute(
+        """
+        UPDATE events e
+        SET registered_count = coalesce(p.n, 0)
+        FROM events e2
+        LEFT JOIN (
+            SELECT event_id, count(*) AS n FROM participants GROUP BY event_id
+        ) p ON p.event_id = e2.id
+        WHERE e.id = e2.id AND e.registered_count <> coalesce(p.n, 0)
+        """
+    )
+
+    op.create_index('uq_participants_event_user', 'participants', ['event_id', 'user_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_participants_event_user', table_name='participants')
@@ -0,0 +1,28 @@
+"""participants role_id index
+
+Revision ID: 8d3b6f0a2c17
+Revises: 7a2f4c6e1d95
+Create Date: 2025-11-27 09:22:48.530671
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3b6f0a2c17'
+down_revision: Union[str, Sequence[str], None] = '7a2f4c6e1d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_participants_role_id'), 'participants', ['role_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_participants_role_id'), table_name='participants')
@@ -0,0 +1,36 @@
+"""events search vector
+
+Revision ID: 9c5d1f7a3e28
+Revises: 4b7e2c91d0a3
+Create Date: 2025-11-24 14:37:02.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5d1f7a3e28'
+down_revision: Union[str, Sequence[str], None] = '4b7e2c91d0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_events_search_vector', 'events', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_search_vector', table_name='events', postgresql_using='gin')
+    op.drop_column('events', 'search_vector')
@@ -0,0 +1,45 @@
+"""foreign key indexes
+
+Revision ID: b6e9d2f4a813
+Revises: 8d3b6f0a2c17
+Create Date: 2025-11-27 14:08:31.774210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e9d2f4a813'
+down_revision: Union[str, Sequence[str], None] = '8d3b6f0a2c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# participants.event_id is covered by uq_participants_event_user and
+# events.event_date by ix_events_event_date_id (leading columns).
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_participants_user_id'), 'participants', ['user_id'], unique=False)
+    op.create_index(op.f('ix_roles_event_id'), 'roles', ['event_id'], unique=False)
+    op.create_index(op.f('ix_schedules_event_id'), 'schedules', ['event_id'], unique=False)
+    op.create_index('ix_event_media_event_id_uploaded_at', 'event_media', ['event_id', 'uploaded_at'], unique=False)
+    op.create_index(op.f('ix_recurrences_event_id'), 'recurrences', ['event_id'], unique=False)
+    op.create_index('ix_recurrences_active', 'recurrences', ['active'], unique=False, postgresql_where=sa.text('active'))
+    op.create_index('ix_attendances_event_id_attendance_day', 'attendances', ['event_id', 'attendance_day'], unique=False)
+    op.create_index(op.f('ix_attendances_participant_id'), 'attendances', ['participant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_attendances_participant_id'), table_name='attendances')
+    op.drop_index('ix_attendances_event_id_attendance_day', table_name='attendances')
+    op.drop_index('ix_recurrences_active', table_name='recurrences', postgresql_where=sa.text('active'))
+    op.drop_index(op.f('ix_recurrences_event_id'), table_name='recurrences')
+    op.drop_index('ix_event_media_event_id_uploaded_at', table_name='event_media')
+    op.drop_index(op.f('ix_schedules_event_id'), table_name='schedules')
+    op.drop_index(op.f('ix_roles_event_id'), table_name='roles')
+    op.drop_index(op.f('ix_participants_user_id'), table_name='participants')
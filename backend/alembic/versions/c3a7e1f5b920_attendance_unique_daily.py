@@ -0,0 +1,47 @@
+"""attendance unique daily
+
+Revision ID: c3a7e1f5b920
+Revises: b6e9d2f4a813
+Create Date: 2025-11-28 09:41:12.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a7e1f5b920'
+down_revision: Union[str, Sequence[str], None] = 'b6e9d2f4a813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the earliest check-in per participant and day
+    op.execute(
+        """
+        DELETE FROM attendances a
+        USING (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY event_id, participant_id, attendance_day
+                       ORDER BY attended_at, id
+                   ) AS n
+            FROM attendances
+        ) ranked
+        WHERE a.id = ranked.id AND ranked.n > 1
+        """
+    )
+
+    op.create_unique_constraint(
+        'uq_attendance_unique_daily', 'attendances',
+        ['event_id', 'participant_id', 'attendance_day'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_attendance_unique_daily', 'attendances', type_='unique')
@@ -0,0 +1,34 @@
+"""attendance sync keys
+
+Revision ID: d8f2b4a6c051
+Revises: c3a7e1f5b920
+Create Date: 2025-11-28 13:22:47.106385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f2b4a6c051'
+down_revision: Union[str, Sequence[str], None] = 'c3a7e1f5b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_sync_keys',
+    sa.Column('key', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_attendance_sync_keys_created_at'), 'attendance_sync_keys', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_attendance_sync_keys_created_at'), table_name='attendance_sync_keys')
+    op.drop_table('attendance_sync_keys')
@@ -0,0 +1,54 @@
+"""attendance rollups
+
+Revision ID: e4c9a1d7f362
+Revises: d8f2b4a6c051
+Create Date: 2025-11-28 16:05:39.248817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c9a1d7f362'
+down_revision: Union[str, Sequence[str], None] = 'd8f2b4a6c051'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_rollups',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('participant_id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('attended_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('first_attended_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_attended_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['participant_id'], ['participants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'participant_id', 'month')
+    )
+    op.create_index(op.f('ix_attendance_rollups_month'), 'attendance_rollups', ['month'], unique=False)
+    op.create_index(op.f('ix_attendance_rollups_participant_id'), 'attendance_rollups', ['participant_id'], unique=False)
+
+    # Backfill (same statement as crud.attendance.rebuild_rollups)
+    op.execute(
+        """
+        INSERT INTO attendance_rollups
+            (event_id, participant_id, month, attended_count, first_attended_at, last_attended_at)
+        SELECT event_id, participant_id, date_trunc('month', attendance_day)::date,
+               count(*), min(attended_at), max(attended_at)
+        FROM attendances
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_attendance_rollups_participant_id'), table_name='attendance_rollups')
+    op.drop_index(op.f('ix_attendance_rollups_month'), table_name='attendance_rollups')
+    op.drop_table('attendance_rollups')
@@ -0,0 +1,87 @@
+"""attendance day local
+
+Revision ID: f1b7d3e9a254
+Revises: e4c9a1d7f362
+Create Date: 2025-12-02 10:14:27.604183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d3e9a254'
+down_revision: Union[str, Sequence[str], None] = 'e4c9a1d7f362'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def rebucket(tz_name: str) -> None:
+    """
+    Recompute attendance_day as the calendar day of attended_at in
+    tz_name, keeping the earliest check-in where two rows now fall on
+    the same day, and rebuild attendance_rollups from the result.
+    """
+    # Rows move between days in both directions, so the constraint is
+    # put back only after every row has its new day
+    op.drop_constraint('uq_attendance_unique_daily', 'attendances', type_='unique')
+
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM attendances a
+            USING (
+                SELECT id,
+                       row_number() OVER (
+                           PARTITION BY event_id, participant_id, (attended_at AT TIME ZONE :tz)::date
+                           ORDER BY attended_at, id
+                       ) AS n
+                FROM attendances
+            ) ranked
+            WHERE a.id = ranked.id AND ranked.n > 1
+            """
+        ).bindparams(tz=tz_name)
+    )
+    op.execute(
+        sa.text(
+            """
+            UPDATE attendances
+            SET attendance_day = (attended_at AT TIME ZONE :tz)::date
+            WHERE attendance_day IS DISTINCT FROM (attended_at AT TIME ZONE :tz)::date
+            """
+        ).bindparams(tz=tz_name)
+    )
+
+    op.create_unique_constraint(
+        'uq_attendance_unique_daily', 'attendances',
+        ['event_id', 'participant_id', 'attendance_day'],
+    )
+
+    # Same statement as crud.attendance.rebuild_rollups
+    op.execute("DELETE FROM attendance_rollups")
+    op.execute(
+        """
+        INSERT INTO attendance_rollups
+            (event_id, participant_id, month, attended_count, first_attended_at, last_attended_at)
+        SELECT event_id, participant_id, date_trunc('month', attendance_day)::date,
+               count(*), min(attended_at), max(attended_at)
+        FROM attendances
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # attendance_day used to be the UTC date of attended_at
+    rebucket(settings.CALENDAR_TIMEZONE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Check-ins removed as duplicates by upgrade() are not restored
+    rebucket('UTC')
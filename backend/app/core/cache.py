@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 512))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 30))
+
+
+# ---------------------------------------------------------
+# Read-through response cache
+#
+# Keys are tuples whose first item is a namespace ("events",
+# "announcements", "roles", "attendance"). Writers call invalidate(namespace)
+# after committing. Everything runs on the event loop, so no
+# await happens between a lookup and the matching update.
+# ---------------------------------------------------------
+class ResponseCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: dict = {}
+        self._generations: dict = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # --------------------------------------------------
+    # Lookup
+    # --------------------------------------------------
+    def get(self, key: Tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Tuple, value: Any, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: Tuple, loader: Callable[[], Awaitable[Any]], ttl: float = None):
+        """
+        Return the cached value for key, or run loader once for all
+        concurrent callers that miss on the same key (single-flight).
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+
+            # Another request is already loading this key
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if pending.cancelled():
+                    continue   # leader went away, try again
+                raise
+
+        self.misses += 1
+        generation = self._generations.get(key[0], 0)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            value = await loader()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()   # mark retrieved when nobody is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        # Skip storing if a writer invalidated the namespace mid-load
+        if value is not None and self._generations.get(key[0], 0) == generation:
+            self.set(key, value, ttl)
+
+        future.set_result(value)
+        return value
+
+    # --------------------------------------------------
+    # Invalidation
+    # --------------------------------------------------
+    def invalidate(self, *namespaces: Hashable):
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            stale = [k for k in self._entries if k[0] == namespace]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,136 @@
+import os
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:  # optional: only used when a brotli wheel is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+
+# Only text-like bodies; xlsx, pdf, zip and images are already compressed
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+# ---------------------------------------------------------
+# Encoding helpers
+# ---------------------------------------------------------
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        token, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip())
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class PrecompressedBody:
+    """
+    A cached response body that keeps each encoded variant after the
+    first request for it, so cache hits never recompress.
+    """
+    __slots__ = ("body", "encoded", "etag")
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        self.body = body
+        self.encoded = {}
+        self.etag = etag
+
+    def encode(self, encoding: str) -> bytes:
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded[encoding] = compress(self.body, encoding)
+        return data
+
+
+# ---------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------
+class CompressionMiddleware:
+    """
+    Compress single-chunk text responses at or above minimum_size.
+    Streaming responses (exports) and responses that already carry a
+    Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            passthrough = True   # only the first body chunk is inspected
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+
+            if message.get("more_body", False) or not self._compressible(start_message["status"], headers, body):
+                await send(start_message)
+                await send(message)
+                return
+
+            data = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(data))
+            headers.add_vary_header("Accept-Encoding")
+
+            await send(start_message)
+            await send({"type": "http.response.body", "body": data})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, status: int, headers: MutableHeaders, body: bytes) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        if len(body) < self.minimum_size:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
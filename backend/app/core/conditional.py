@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+# ---------------------------------------------------------
+# Conditional GET (ETag / Last-Modified)
+#
+# Routes compute a cheap validator from the database (row
+# updated_at, or max(updated_at) + count for collections),
+# call not_modified() and return its 304 before loading or
+# serializing anything. Cached bodies keep the validator read
+# before they were loaded, so it never describes a newer state
+# than the body it is sent with.
+# ---------------------------------------------------------
+def make_etag(*parts) -> str:
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are the same validator
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def _unmodified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    Set validators on the outgoing response and return a bare 304 when
+    the client's copy is still current, otherwise None.
+
+    Only pass last_modified when the timestamp alone changes with every
+    visible change; collections rely on the ETag because deletes do not
+    move max(updated_at).
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        matched = bool(
+            if_modified_since
+            and last_modified is not None
+            and _unmodified_since(if_modified_since, last_modified)
+        )
+
+    if matched:
+        return Response(status_code=304, headers=headers)
+    return None
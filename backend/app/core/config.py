@@ -10,6 +10,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Local timezone used to bucket events and attendance into calendar days
+    CALENDAR_TIMEZONE: str = 'Asia/Jakarta'
     
     class Config:
         # This allows pydantic to read from environment variables
@@ -0,0 +1,42 @@
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple, Type
+
+from pydantic import BaseModel, create_model
+
+
+# ---------------------------------------------------------
+# Sparse fieldsets (?fields=id,title,event_date)
+# ---------------------------------------------------------
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Normalize a comma-separated field list into a tuple ordered like
+    `allowed`, so equivalent requests share one cached projection.
+    Returns None when no list was given. Raises ValueError naming any
+    unknown field.
+    """
+    if raw is None or not raw.strip():
+        return None
+
+    allowed = tuple(allowed)
+    requested = {f.strip() for f in raw.split(",") if f.strip()}
+
+    unknown = sorted(requested - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return tuple(f for f in allowed if f in requested)
+
+
+@lru_cache(maxsize=256)
+def subset_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """A copy of `schema` that only declares `fields`."""
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in schema.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f"{schema.__name__}_{'_'.join(fields)}",
+        __config__=schema.model_config,
+        **definitions,
+    )
@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+
+# ---------------------------------------------------------
+# Keyset cursors
+#
+# A cursor is the (event_date, id) of the last row of a page,
+# plus the search rank when results are ordered by relevance,
+# packed as url-safe base64 JSON so clients treat it as opaque.
+# ---------------------------------------------------------
+def encode_cursor(sort_value: datetime, row_id: UUID, rank: Optional[float] = None) -> str:
+    data = {"d": sort_value.isoformat(), "id": str(row_id)}
+    if rank is not None:
+        data["r"] = rank
+    raw = json.dumps(data)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID, Optional[float]]]:
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        rank = data.get("r")
+        return (
+            datetime.fromisoformat(data["d"]),
+            UUID(data["id"]),
+            float(rank) if rank is not None else None,
+        )
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor")
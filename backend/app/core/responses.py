@@ -0,0 +1,61 @@
+import json
+from functools import lru_cache
+from typing import Any, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.compression import COMPRESS_MIN_SIZE, PrecompressedBody, negotiate_encoding
+
+
+# ---------------------------------------------------------
+# Fast JSON responses
+#
+# ORM rows are validated once into the output schema and dumped
+# straight to bytes by pydantic-core, instead of
+# from_orm().dict() -> jsonable_encoder -> json.dumps.
+# ---------------------------------------------------------
+class JSONBytesResponse(Response):
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Type[BaseModel], many: bool) -> TypeAdapter:
+    return TypeAdapter(list[schema] if many else schema)
+
+
+def serialize(schema: Type[BaseModel], value: Any, many: bool = False) -> bytes:
+    adapter = _adapter(schema, many)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def envelope(data: bytes, **extra) -> bytes:
+    """Wrap pre-serialized data as {"success": true, "data": ..., **extra}."""
+    parts = [b'{"success":true,"data":', data]
+    for key, value in extra.items():
+        parts.append(b",%s:%s" % (json.dumps(key).encode(), json.dumps(value, default=str).encode()))
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+def envelope_response(schema: Type[BaseModel], value: Any, many: bool = False, **extra) -> JSONBytesResponse:
+    return JSONBytesResponse(envelope(serialize(schema, value, many), **extra))
+
+
+def cached_json_response(request: Request, entry: PrecompressedBody, headers=None) -> JSONBytesResponse:
+    """
+    Serve a cached body, reusing (or creating once) the encoded variant
+    the client accepts. The compression middleware skips it because
+    Content-Encoding is already set.
+    """
+    encoding = None
+    if len(entry.body) >= COMPRESS_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+
+    if encoding is None:
+        return JSONBytesResponse(entry.body, headers=headers)
+
+    response = JSONBytesResponse(entry.encode(encoding), headers=headers)
+    response.headers["Content-Encoding"] = encoding
+    response.headers.add_vary_header("Accept-Encoding")
+    return response
@@ -1,15 +1,49 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from app.models.announcement import Announcement
+from app.core.cache import response_cache
 
 async def create_announcement(session: AsyncSession, title, body):
     a = Announcement(title=title, body=body)
     session.add(a)
     await session.commit()
     await session.refresh(a)
+    response_cache.invalidate("announcements")
     return a
 
 async def list_announcements(session: AsyncSession):
     stmt = select(Announcement).order_by(Announcement.created_at.desc()).limit(50)
     result = await session.execute(stmt)
     return result.scalars().all()
+
+async def collection_version(session: AsyncSession):
+    result = await session.execute(
+        select(func.max(Announcement.updated_at), func.count(Announcement.id))
+    )
+    return tuple(result.one())
+
+async def version(session: AsyncSession, announcement_id):
+    result = await session.execute(
+        select(Announcement.updated_at).where(Announcement.id == announcement_id)
+    )
+    return result.scalar_one_or_none()
+
+async def update_announcement(session: AsyncSession, announcement_id, title, body):
+    a = await session.get(Announcement, announcement_id)
+    if not a:
+        return None
+    a.title = title
+    a.body = body
+    await session.commit()
+    await session.refresh(a)
+    response_cache.invalidate("announcements")
+    return a
+
+async def delete_announcement(session: AsyncSession, announcement_id):
+    a = await session.get(Announcement, announcement_id)
+    if not a:
+        return False
+    await session.delete(a)
+    await session.commit()
+    response_cache.invalidate("announcements")
+    return True
@@ -1,7 +1,161 @@
-from sqlalchemy import select
+import os
+from sqlalchemy import select, delete, update, func, tuple_, and_, not_, cast, literal, null, union_all, values, column, Date, DateTime, Integer, String, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.attendance import Attendance
-from datetime import datetime, date
+from app.models.attendance import Attendance, AttendanceRollup, AttendanceSyncKey
+from app.models.participant import Participant
+from app.models.event import Event
+from app.models.user import User
+from app.core.config import settings
+from app.core.cache import response_cache
+from datetime import datetime, date, time, timezone, timedelta
+from zoneinfo import ZoneInfo
+
+# Bulk check-in outcomes
+RECORDED = "recorded"
+ALREADY_RECORDED = "already_recorded"
+INVALID = "invalid"
+
+# Offline sync outcomes
+APPLIED = "applied"
+DUPLICATE = "duplicate"
+
+# How long a sync key is remembered; a queue replayed later is applied again
+ATTENDANCE_SYNC_KEY_TTL_DAYS = int(os.getenv("ATTENDANCE_SYNC_KEY_TTL_DAYS", 30))
+
+
+def attendance_day_for(attended_at: datetime) -> date:
+    """The local calendar day an attendance counts for."""
+    return as_utc(attended_at).astimezone(ZoneInfo(settings.CALENDAR_TIMEZONE)).date()
+
+
+def as_utc(value: datetime) -> datetime:
+    """Naive values are taken as UTC, as the timestamptz column stores them."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# ---------------------------------------------------------
+# Monthly rollups
+#
+# attendance_rollups holds one row per (event, participant, month)
+# and is updated by every write below before it commits, so reports
+# never have to aggregate the raw attendances table.
+# ---------------------------------------------------------
+def month_of(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _rollup_month(day_column):
+    return cast(func.date_trunc("month", day_column), Date)
+
+
+async def _rollup_add(session: AsyncSession, attendance_ids):
+    """Count freshly inserted attendances into their monthly rollups."""
+    if not attendance_ids:
+        return
+    month = _rollup_month(Attendance.attendance_day)
+    added = (
+        select(
+            Attendance.event_id,
+            Attendance.participant_id,
+            month,
+            func.count(),
+            func.min(Attendance.attended_at),
+            func.max(Attendance.attended_at),
+        )
+        .where(Attendance.id.in_(attendance_ids))
+        .group_by(Attendance.event_id, Attendance.participant_id, month)
+    )
+    stmt = pg_insert(AttendanceRollup).from_select(
+        ["event_id", "participant_id", "month", "attended_count", "first_attended_at", "last_attended_at"],
+        added,
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[AttendanceRollup.event_id, AttendanceRollup.participant_id, AttendanceRollup.month],
+            set_={
+                "attended_count": AttendanceRollup.attended_count + stmt.excluded.attended_count,
+                "first_attended_at": func.least(AttendanceRollup.first_attended_at, stmt.excluded.first_attended_at),
+                "last_attended_at": func.greatest(AttendanceRollup.last_attended_at, stmt.excluded.last_attended_at),
+            },
+        )
+    )
+
+
+async def _rollup_remove(session: AsyncSession, removed):
+    """Take deleted (event_id, participant_id, attendance_day) rows out of the rollups."""
+    counts = {}
+    for event_id, participant_id, day in removed:
+        key = (event_id, participant_id, month_of(day))
+        counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return
+
+    gone = values(
+        column("event_id", PG_UUID(as_uuid=True)),
+        column("participant_id", PG_UUID(as_uuid=True)),
+        column("month", Date),
+        column("n", Integer),
+        name="gone",
+    ).data([(*key, n) for key, n in counts.items()])
+
+    remaining = select(Attendance.attended_at).where(
+        Attendance.event_id == AttendanceRollup.event_id,
+        Attendance.participant_id == AttendanceRollup.participant_id,
+        Attendance.attendance_day >= AttendanceRollup.month,
+        Attendance.attendance_day < AttendanceRollup.month + text("interval '1 month'"),
+    )
+    await session.execute(
+        update(AttendanceRollup)
+        .where(
+            AttendanceRollup.event_id == gone.c.event_id,
+            AttendanceRollup.participant_id == gone.c.participant_id,
+            AttendanceRollup.month == gone.c.month,
+        )
+        .values(
+            attended_count=AttendanceRollup.attended_count - gone.c.n,
+            first_attended_at=remaining.with_only_columns(func.min(Attendance.attended_at)).scalar_subquery(),
+            last_attended_at=remaining.with_only_columns(func.max(Attendance.attended_at)).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        delete(AttendanceRollup).where(
+            tuple_(AttendanceRollup.event_id, AttendanceRollup.participant_id, AttendanceRollup.month).in_(list(counts)),
+            AttendanceRollup.attended_count <= 0,
+        )
+    )
+
+
+async def rebuild_rollups(session: AsyncSession) -> int:
+    """Recompute attendance_rollups from attendances. Returns the row count."""
+    # Writers wait for the rebuild instead of updating rows it is replacing
+    await session.execute(text("LOCK TABLE attendances IN SHARE MODE"))
+    await session.execute(delete(AttendanceRollup))
+    month = _rollup_month(Attendance.attendance_day)
+    result = await session.execute(
+        pg_insert(AttendanceRollup).from_select(
+            ["event_id", "participant_id", "month", "attended_count", "first_attended_at", "last_attended_at"],
+            select(
+                Attendance.event_id,
+                Attendance.participant_id,
+                month,
+                func.count(),
+                func.min(Attendance.attended_at),
+                func.max(Attendance.attended_at),
+            ).group_by(Attendance.event_id, Attendance.participant_id, month),
+        )
+    )
+    await session.commit()
+    response_cache.invalidate("attendance")
+    return result.rowcount
+
 
 async def create_attendance(
     session: AsyncSession,
@@ -12,13 +166,13 @@ async def create_attendance(
 ):
     # If attended_at not provided, use current time
     if attended_at is None:
-        attended_at = datetime.now()
+        attended_at = datetime.now(timezone.utc)
     
     # Extract the date from attended_at for attendance_day
     if isinstance(attended_at, str):
         attended_at = datetime.fromisoformat(attended_at.replace('Z', '+00:00'))
     
-    attendance_day = attended_at.date()
+    attendance_day = attendance_day_for(attended_at)
     
     attendance = Attendance(
         event_id=event_id,
@@ -29,17 +183,201 @@ async def create_attendance(
     )
     
     session.add(attendance)
+    await session.flush()
+    await _rollup_add(session, [attendance.id])
     await session.commit()
+    response_cache.invalidate("attendance")
     await session.refresh(attendance)
     return attendance
 
 
+async def bulk_create_attendance(session: AsyncSession, event_id, items, marked_by=None) -> list:
+    """
+    Record many check-ins for one event in a single INSERT. Rows already
+    recorded for that participant and day are left untouched
+    (uq_attendance_unique_daily). Returns one result dict per item, in order.
+    """
+    participant_ids = {item.participant_id for item in items}
+    q = await session.execute(
+        select(Participant.id).where(
+            Participant.event_id == event_id,
+            Participant.id.in_(participant_ids),
+        )
+    )
+    in_event = set(q.scalars().all())
+
+    now = datetime.now(timezone.utc)
+    rows = {}   # (participant_id, attendance_day) -> values, first item wins
+    keys = []
+    for item in items:
+        if item.participant_id not in in_event:
+            keys.append(None)
+            continue
+        attended_at = item.attended_at or now
+        key = (item.participant_id, attendance_day_for(attended_at))
+        rows.setdefault(key, {
+            "event_id": event_id,
+            "participant_id": item.participant_id,
+            "attended_at": attended_at,
+            "attendance_day": key[1],
+            "marked_by": marked_by,
+            "notes": item.notes,
+        })
+        keys.append(key)
+
+    ids = {}
+    if rows:
+        q = await session.execute(
+            pg_insert(Attendance)
+            .values(list(rows.values()))
+            .on_conflict_do_nothing(constraint="uq_attendance_unique_daily")
+            .returning(Attendance.id, Attendance.participant_id, Attendance.attendance_day)
+        )
+        inserted = {(p, d): i for i, p, d in q.all()}
+        await _rollup_add(session, list(inserted.values()))
+
+        existing = set(rows) - set(inserted)
+        if existing:
+            q = await session.execute(
+                select(Attendance.id, Attendance.participant_id, Attendance.attendance_day).where(
+                    Attendance.event_id == event_id,
+                    tuple_(Attendance.participant_id, Attendance.attendance_day).in_(list(existing)),
+                )
+            )
+            ids = {(p, d): (i, ALREADY_RECORDED) for i, p, d in q.all()}
+        ids.update((key, (i, RECORDED)) for key, i in inserted.items())
+        await session.commit()
+        response_cache.invalidate("attendance")
+
+    results = []
+    for item, key in zip(items, keys):
+        if key is None:
+            results.append({
+                "participant_id": str(item.participant_id),
+                "status": INVALID,
+                "message": "Peserta tidak terdaftar di acara ini",
+            })
+            continue
+        attendance_id, status = ids.get(key, (None, ALREADY_RECORDED))
+        if status == RECORDED:
+            ids[key] = (attendance_id, ALREADY_RECORDED)   # a repeated item is reported as already recorded
+        results.append({
+            "participant_id": str(item.participant_id),
+            "status": status,
+            "attendance_id": str(attendance_id) if attendance_id else None,
+            "attendance_day": key[1].isoformat(),
+        })
+    return results
+
+
+async def sync_attendance(session: AsyncSession, ops, marked_by=None) -> list:
+    """
+    Apply queued offline check-ins and undos in one transaction, in
+    device-time order. Keys seen before are skipped. Returns one result
+    dict per op, in request order.
+    """
+    await session.execute(
+        delete(AttendanceSyncKey).where(
+            AttendanceSyncKey.created_at < func.now() - timedelta(days=ATTENDANCE_SYNC_KEY_TTL_DAYS)
+        )
+    )
+
+    # Claim every key at once; a concurrent replay of the same key waits
+    # on the primary key and then skips it.
+    fresh = set()
+    keys = list(dict.fromkeys(op.key for op in ops))
+    if keys:
+        q = await session.execute(
+            pg_insert(AttendanceSyncKey)
+            .values([{"key": k} for k in keys])
+            .on_conflict_do_nothing()
+            .returning(AttendanceSyncKey.key)
+        )
+        fresh = set(q.scalars().all())
+
+    q = await session.execute(
+        select(Participant.id, Participant.event_id).where(
+            Participant.id.in_({op.participant_id for op in ops})
+        )
+    )
+    event_of = dict(q.all())
+
+    status = {}
+    # (event_id, participant_id, day) -> [undone in this batch, row to insert]
+    state = {}
+    for op in sorted(ops, key=lambda op: as_utc(op.at)):   # devices may send naive times
+        if op.key not in fresh:
+            status.setdefault(op.key, DUPLICATE)
+            continue
+        fresh.discard(op.key)   # a key repeated within the batch counts once
+        if event_of.get(op.participant_id) != op.event_id:
+            status[op.key] = INVALID
+            continue
+        status[op.key] = APPLIED
+
+        day = attendance_day_for(op.at)
+        entry = state.setdefault((op.event_id, op.participant_id, day), [False, None])
+        if op.action == "undo":
+            entry[0], entry[1] = True, None
+        elif entry[1] is None:
+            entry[1] = {
+                "event_id": op.event_id,
+                "participant_id": op.participant_id,
+                "attended_at": as_utc(op.at),
+                "attendance_day": day,
+                "marked_by": marked_by,
+                "notes": op.notes,
+            }
+
+    # Net effect of the ops in order: drop what was undone, then insert
+    # what is checked in at the end (a check-in on a day already recorded
+    # and never undone is a no-op, as with a single mark).
+    undone = [k for k, (reset, _) in state.items() if reset]
+    if undone:
+        q = await session.execute(
+            delete(Attendance)
+            .where(
+                tuple_(Attendance.event_id, Attendance.participant_id, Attendance.attendance_day).in_(undone)
+            )
+            .returning(Attendance.event_id, Attendance.participant_id, Attendance.attendance_day)
+        )
+        await _rollup_remove(session, q.all())
+    rows = [row for _, row in state.values() if row is not None]
+    if rows:
+        q = await session.execute(
+            pg_insert(Attendance)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="uq_attendance_unique_daily")
+            .returning(Attendance.id)
+        )
+        await _rollup_add(session, q.scalars().all())
+
+    # Only applied ops keep their key, so a corrected replay of an
+    # invalid op is not reported as a duplicate
+    invalid = [k for k, s in status.items() if s == INVALID]
+    if invalid:
+        await session.execute(delete(AttendanceSyncKey).where(AttendanceSyncKey.key.in_(invalid)))
+    await session.commit()
+    response_cache.invalidate("attendance")
+
+    return [
+        {"key": str(op.key), "status": status.get(op.key, DUPLICATE)}
+        for op in ops
+    ]
+
+
 async def delete_attendance(session: AsyncSession, attendance_id: str):
-    a = await session.get(Attendance, attendance_id)
-    if not a:
+    q = await session.execute(
+        delete(Attendance)
+        .where(Attendance.id == attendance_id)
+        .returning(Attendance.event_id, Attendance.participant_id, Attendance.attendance_day)
+    )
+    removed = q.all()
+    if not removed:
         return False
-    await session.delete(a)
+    await _rollup_remove(session, removed)
     await session.commit()
+    response_cache.invalidate("attendance")
     return True
 
 
@@ -50,39 +388,87 @@ async def list_attendances_for_event(session: AsyncSession, event_id: str):
     return result.scalars().all()
 
 
-async def attendance_report(
-    session: AsyncSession,
+def attendance_report_query(
     event_id: str = None,
     start_date: date = None,
     end_date: date = None
 ):
-    from sqlalchemy import func
-    from app.models.participant import Participant
-    from app.models.user import User
-    
-    # Base query
-    query = select(
-        Attendance.participant_id,
+    """
+    Per-participant attendance counts, ordered by name (for exports).
+    Whole months inside the period come from attendance_rollups; only
+    the days of a partial first or last month are counted from
+    attendances.
+    """
+    # Months [lo, hi) lie completely inside the period; None = unbounded
+    lo = hi = None
+    if start_date:
+        lo = start_date if start_date.day == 1 else next_month(month_of(start_date))
+    if end_date:
+        month_end = (end_date + timedelta(days=1)).day == 1
+        hi = next_month(month_of(end_date)) if month_end else month_of(end_date)
+
+    in_period = []
+    if start_date:
+        in_period.append(Attendance.attendance_day >= start_date)
+    if end_date:
+        in_period.append(Attendance.attendance_day <= end_date)
+
+    def raw_counts(*where):
+        raw = select(
+            Attendance.participant_id,
+            func.count().label("n"),
+        ).where(*in_period, *where).group_by(Attendance.participant_id)
+        if event_id:
+            raw = raw.where(Attendance.event_id == event_id)
+        return raw
+
+    if lo and hi and lo >= hi:
+        # Not a single whole month: count the period directly
+        parts = [raw_counts()]
+    else:
+        rolled = select(
+            AttendanceRollup.participant_id,
+            AttendanceRollup.attended_count.label("n"),
+        )
+        if event_id:
+            rolled = rolled.where(AttendanceRollup.event_id == event_id)
+        in_months = []
+        if lo:
+            rolled = rolled.where(AttendanceRollup.month >= lo)
+            in_months.append(Attendance.attendance_day >= lo)
+        if hi:
+            rolled = rolled.where(AttendanceRollup.month < hi)
+            in_months.append(Attendance.attendance_day < hi)
+        parts = [rolled]
+        if in_months:
+            parts.append(raw_counts(not_(and_(*in_months))))
+
+    counts = (union_all(*parts) if len(parts) > 1 else parts[0]).subquery("counts")
+
+    return select(
+        counts.c.participant_id,
         User.full_name.label('participant_name'),
-        func.count(Attendance.id).label('attended_count')
+        cast(func.sum(counts.c.n), Integer).label('attended_count')
     ).join(
-        Participant, Attendance.participant_id == Participant.id
+        Participant, counts.c.participant_id == Participant.id
     ).join(
         User, Participant.user_id == User.id
     ).group_by(
-        Attendance.participant_id,
+        counts.c.participant_id,
         User.full_name
+    ).order_by(
+        User.full_name,
+        counts.c.participant_id
     )
-    
-    # Apply filters
-    if event_id:
-        query = query.where(Attendance.event_id == event_id)
-    if start_date:
-        query = query.where(Attendance.attendance_day >= start_date)
-    if end_date:
-        query = query.where(Attendance.attendance_day <= end_date)
-    
-    result = await session.execute(query)
+
+
+async def attendance_report(
+    session: AsyncSession,
+    event_id: str = None,
+    start_date: date = None,
+    end_date: date = None
+):
+    result = await session.execute(attendance_report_query(event_id, start_date, end_date))
     rows = result.all()
     
     return [
@@ -92,4 +478,183 @@ async def attendance_report(
             "attended_count": row.attended_count
         }
         for row in rows
-    ]
\ No newline at end of file
+    ]
+
+
+def _rate(part, whole):
+    return round(min(part / whole, 1.0), 4) if whole else None
+
+
+def _stats(registered, attendees, check_ins, **extra) -> dict:
+    rate = _rate(attendees, registered)
+    return {
+        **extra,
+        "registered": registered,
+        "attendees": attendees,
+        "check_ins": check_ins,
+        "attendance_rate": rate,
+        "no_show_ratio": round(1 - rate, 4) if rate is not None else None,
+    }
+
+
+async def monthly_report(
+    session: AsyncSession,
+    start_month: date,
+    end_month: date,
+    tz_name: str,
+    event_id=None,
+    top: int = 10
+) -> dict:
+    """
+    Attendance analytics for events held from start_month to end_month
+    (local months in tz_name): per-event and per-month attendance rates
+    and no-show ratios, plus the `top` attendees by check-ins.
+
+    One statement: per-month totals are window sums over the per-event
+    rows and attendees are ranked with rank(); both kinds of row come
+    back through a UNION ALL told apart by `kind`.
+    """
+    tz = ZoneInfo(tz_name)
+    lower = datetime.combine(start_month, time.min, tzinfo=tz)
+    upper = datetime.combine(next_month(end_month), time.min, tzinfo=tz)
+    month = cast(func.date_trunc("month", func.timezone(tz_name, Event.event_date)), Date)
+
+    ev = (
+        select(Event.id, Event.title, Event.event_date, month.label("month"), Event.registered_count)
+        .where(
+            Event.event_date >= lower,   # ix_events_event_date_id
+            Event.event_date < upper,
+            Event.is_cancelled.isnot(True),
+        )
+    )
+    if event_id:
+        ev = ev.where(Event.id == event_id)
+    ev = ev.cte("ev")
+
+    # Each attendee of each event, check-ins summed over the rollup months
+    att = (
+        select(
+            AttendanceRollup.event_id,
+            AttendanceRollup.participant_id,
+            func.sum(AttendanceRollup.attended_count).label("check_ins"),
+        )
+        .join(ev, ev.c.id == AttendanceRollup.event_id)
+        .group_by(AttendanceRollup.event_id, AttendanceRollup.participant_id)
+        .cte("att")
+    )
+
+    per_event = (
+        select(
+            ev.c.id,
+            ev.c.title,
+            ev.c.event_date,
+            ev.c.month,
+            ev.c.registered_count.label("registered"),
+            func.count(att.c.participant_id).label("attendees"),
+            func.coalesce(func.sum(att.c.check_ins), 0).label("check_ins"),
+        )
+        .select_from(ev.outerjoin(att, att.c.event_id == ev.c.id))
+        .group_by(ev.c.id, ev.c.title, ev.c.event_date, ev.c.month, ev.c.registered_count)
+        .cte("per_event")
+    )
+
+    check_ins = func.sum(att.c.check_ins)
+    per_user = (
+        select(
+            Participant.user_id,
+            check_ins.label("check_ins"),
+            func.count().label("events_attended"),
+            func.rank().over(order_by=check_ins.desc()).label("rank"),
+        )
+        .join(Participant, Participant.id == att.c.participant_id)
+        .group_by(Participant.user_id)
+        .cte("per_user")
+    )
+
+    def month_sum(col):
+        return cast(func.sum(col).over(partition_by=per_event.c.month), Integer)
+
+    events_q = select(
+        literal("event").label("kind"),
+        per_event.c.id,
+        cast(per_event.c.title, String).label("name"),
+        per_event.c.event_date,
+        per_event.c.month,
+        per_event.c.registered,
+        cast(per_event.c.attendees, Integer).label("attendees"),
+        cast(per_event.c.check_ins, Integer).label("check_ins"),
+        cast(func.count().over(partition_by=per_event.c.month), Integer).label("month_events"),
+        month_sum(per_event.c.registered).label("month_registered"),
+        month_sum(per_event.c.attendees).label("month_attendees"),
+        month_sum(per_event.c.check_ins).label("month_check_ins"),
+        cast(null(), Integer).label("rank"),
+    )
+    top_q = (
+        select(
+            literal("top").label("kind"),
+            per_user.c.user_id,
+            cast(User.full_name, String),
+            cast(null(), DateTime(timezone=True)),
+            cast(null(), Date),
+            cast(null(), Integer),
+            cast(per_user.c.events_attended, Integer),
+            cast(per_user.c.check_ins, Integer),
+            cast(null(), Integer),
+            cast(null(), Integer),
+            cast(null(), Integer),
+            cast(null(), Integer),
+            cast(per_user.c.rank, Integer),
+        )
+        .join(User, User.id == per_user.c.user_id)
+        .where(per_user.c.rank <= top)
+    )
+
+    result = await session.execute(union_all(events_q, top_q))
+
+    months = {}
+    m = start_month
+    while m <= end_month:
+        months[m] = {"month": m.strftime("%Y-%m"), "per_event": []}
+        m = next_month(m)
+    top_attendees = []
+
+    for row in result.all():
+        if row.kind == "top":
+            top_attendees.append({
+                "user_id": row.id,
+                "full_name": row.name,
+                "check_ins": row.check_ins,
+                "events_attended": row.attendees,
+                "rank": row.rank,
+            })
+            continue
+        entry = months[row.month]
+        if "events" not in entry:
+            entry.update(_stats(
+                row.month_registered, row.month_attendees, row.month_check_ins,
+                events=row.month_events,
+            ))
+        entry["per_event"].append(_stats(
+            row.registered, row.attendees, row.check_ins,
+            event_id=row.id, title=row.name, event_date=row.event_date,
+        ))
+
+    for entry in months.values():
+        if "events" not in entry:
+            entry.update(_stats(0, 0, 0, events=0))
+        entry["per_event"].sort(key=lambda e: e["event_date"])
+    top_attendees.sort(key=lambda t: (t["rank"], t["full_name"] or ""))
+
+    totals = _stats(
+        sum(e["registered"] for e in months.values()),
+        sum(e["attendees"] for e in months.values()),
+        sum(e["check_ins"] for e in months.values()),
+        events=sum(e["events"] for e in months.values()),
+    )
+    return {
+        "start_month": start_month.strftime("%Y-%m"),
+        "end_month": end_month.strftime("%Y-%m"),
+        "totals": totals,
+        "months": list(months.values()),
+        "top_attendees": top_attendees,
+    }
@@ -1,8 +1,72 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, func
-from sqlalchemy.orm import selectinload
-from typing import Optional
+from sqlalchemy import select, update, or_, and_, func, tuple_, literal, Float, Date, cast
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by, insert as pg_insert
+from sqlalchemy.orm import selectinload, with_expression
+from typing import Optional, Tuple
+from datetime import datetime, date, time, timedelta
+from zoneinfo import ZoneInfo
+from uuid import UUID
+import re
 from app.models.event import Event
+from app.models.participant import Participant
+from app.models.event_media import EventMedia
+from app.models.recurrence import Recurrence
+from app.models.schedule import Schedule
+from app.core.cache import response_cache
+
+
+# ---------------------------------------------------------
+# THUMBNAIL (first uploaded banner, without loading media rows)
+# ---------------------------------------------------------
+THUMBNAIL_URL = (
+    select(EventMedia.file_url)
+    .where(EventMedia.event_id == Event.id)
+    .order_by(EventMedia.uploaded_at.asc())
+    .limit(1)
+    .scalar_subquery()
+)
+
+
+# ---------------------------------------------------------
+# LOADER PROFILES
+# Each query names the relationships it serializes; the model
+# itself loads nothing eagerly.
+# ---------------------------------------------------------
+EVENT_LOAD_PROFILES = {
+    "minimal": (),
+    "list": (
+        selectinload(Event.media),
+        with_expression(Event.thumbnail_url, THUMBNAIL_URL),
+    ),
+    "detail": (
+        selectinload(Event.media),
+        selectinload(Event.recurrence),
+        with_expression(Event.thumbnail_url, THUMBNAIL_URL),
+    ),
+    "admin_detail": (
+        selectinload(Event.media),
+        selectinload(Event.recurrence),
+        selectinload(Event.roles),
+        selectinload(Event.schedules),
+    ),
+}
+
+
+def event_load_options(profile: str = "minimal"):
+    return EVENT_LOAD_PROFILES[profile]
+
+
+# ---------------------------------------------------------
+# GET EVENT
+# ---------------------------------------------------------
+async def get_event(session: AsyncSession, event_id, profile: str = "minimal"):
+    stmt = (
+        select(Event)
+        .where(Event.id == event_id)
+        .options(*event_load_options(profile))
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
 
 
 # ---------------------------------------------------------
@@ -44,6 +108,7 @@ async def create_event(
         session.add(rec)
         await session.commit()
 
+    response_cache.invalidate("events")
     return new_event
 
 
@@ -52,14 +117,7 @@ async def create_event(
 # UPDATE EVENT
 # ---------------------------------------------------------
 async def update_event(session: AsyncSession, event_id: str, update_data: dict):
-    stmt = (
-        select(Event)
-        .where(Event.id == event_id)
-        .options(selectinload(Event.media))   # ensure media loaded on refresh
-    )
-
-    result = await session.execute(stmt)
-    ev = result.scalar_one_or_none()
+    ev = await get_event(session, event_id)
 
     if ev is None:
         return None
@@ -70,6 +128,7 @@ async def update_event(session: AsyncSession, event_id: str, update_data: dict):
 
     await session.commit()
     await session.refresh(ev)
+    response_cache.invalidate("events")
     return ev
 
 
@@ -78,45 +137,419 @@ async def update_event(session: AsyncSession, event_id: str, update_data: dict):
 # DELETE EVENT
 # ---------------------------------------------------------
 async def delete_event(session: AsyncSession, event_id: str):
-    stmt = select(Event).where(Event.id == event_id)
-    result = await session.execute(stmt)
-    ev = result.scalar_one_or_none()
+    ev = await get_event(session, event_id)
 
     if ev is None:
         return None
 
     await session.delete(ev)
     await session.commit()
+    response_cache.invalidate("events", "roles")
     return ev
 
 
 
 # ---------------------------------------------------------
-# LIST EVENTS (WITH MEDIA PRELOADED)
+# REGISTERED COUNT
+#
+# events.registered_count mirrors the participants rows. Every
+# path that inserts or deletes a Participant adjusts it in the
+# same transaction; reconcile_registered_counts() repairs drift
+# (e.g. rows removed by hand or by an FK cascade).
+# updated_at is pinned so a registration does not read as an
+# edit of the event.
+# ---------------------------------------------------------
+def slots_remaining(event: Event) -> Optional[int]:
+    if event.slots_available is None:
+        return None
+    return max(event.slots_available - event.registered_count, 0)
+
+
+async def adjust_registered_count(session: AsyncSession, event_id, delta: int):
+    await session.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(registered_count=Event.registered_count + delta, updated_at=Event.updated_at)
+    )
+
+
+async def release_user_registrations(session: AsyncSession, user_id):
+    """Decrement every event user_id is registered for (before the user is deleted)."""
+    per_event = (
+        select(Participant.event_id, func.count(Participant.id).label("n"))
+        .where(Participant.user_id == user_id)
+        .group_by(Participant.event_id)
+        .subquery()
+    )
+    await session.execute(
+        update(Event)
+        .where(Event.id == per_event.c.event_id)
+        .values(registered_count=Event.registered_count - per_event.c.n, updated_at=Event.updated_at)
+    )
+
+
+async def reconcile_registered_counts(session: AsyncSession) -> list:
+    """
+    Repair drifted counters in bulk; returns the ids that were fixed.
+
+    The drifted rows are locked before they are recounted: writers
+    take the same row lock when they adjust the counter, and the
+    recount statement's snapshot then includes all of their rows.
+    """
+    actual = func.count(Participant.id)
+    drifted = (
+        select(Event.id)
+        .outerjoin(Participant, Participant.event_id == Event.id)
+        .group_by(Event.id)
+        .having(actual != Event.registered_count)
+    )
+    event_ids = (await session.execute(drifted)).scalars().all()
+    if not event_ids:
+        await session.rollback()
+        return []
+
+    await session.execute(
+        select(Event.id).where(Event.id.in_(event_ids)).order_by(Event.id).with_for_update()
+    )
+
+    recount = (
+        select(func.count(Participant.id))
+        .where(Participant.event_id == Event.id)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(Event)
+        .where(Event.id.in_(event_ids), Event.registered_count != recount)
+        .values(registered_count=recount, updated_at=Event.updated_at)
+        .returning(Event.id)
+    )
+    fixed = result.scalars().all()
+    await session.commit()
+
+    if fixed:
+        response_cache.invalidate("events")
+    return fixed
+
+
+# ---------------------------------------------------------
+# REGISTER (capacity and duplicates checked by Postgres)
+#
+# One statement: the UPDATE reserves a slot (re-checking the
+# latest row version if it had to wait for the row lock) and
+# the INSERT ... ON CONFLICT DO NOTHING against
+# uq_participants_event_user rejects duplicates. If nothing was
+# inserted the reservation is rolled back.
+# ---------------------------------------------------------
+REGISTERED = "registered"
+NOT_FOUND = "not_found"
+CLOSED = "closed"
+DUPLICATE = "duplicate"
+FULL = "full"
+
+
+def insert_participants():
+    """INSERT into participants that skips (event_id, user_id) pairs already present."""
+    return pg_insert(Participant).on_conflict_do_nothing(
+        index_elements=[Participant.event_id, Participant.user_id]
+    )
+
+
+async def register_participant(session: AsyncSession, event_id, user_id) -> Tuple[str, Optional[int]]:
+    """
+    Register user_id for event_id. Returns (outcome, slots_remaining);
+    the transaction is committed only when outcome is REGISTERED.
+    """
+    reserved = (
+        update(Event)
+        .where(
+            Event.id == event_id,
+            Event.requires_registration.is_(True),
+            or_(Event.slots_available.is_(None), Event.registered_count < Event.slots_available),
+        )
+        .values(registered_count=Event.registered_count + 1, updated_at=Event.updated_at)
+        .returning(Event.id, Event.slots_available, Event.registered_count)
+        .cte("reserved")
+    )
+    inserted = (
+        insert_participants()
+        .from_select(
+            ["event_id", "user_id"],
+            select(reserved.c.id, literal(user_id, Participant.user_id.type)),
+        )
+        .returning(Participant.id)
+        .cte("inserted")
+    )
+    result = await session.execute(
+        select(
+            reserved.c.slots_available,
+            reserved.c.registered_count,
+            select(inserted.c.id).scalar_subquery(),
+        )
+    )
+    event = result.first()
+
+    if event is None or event[2] is None:
+        await session.rollback()
+        result = await session.execute(
+            select(
+                Event.requires_registration,
+                select(Participant.id)
+                .where(Participant.event_id == event_id, Participant.user_id == user_id)
+                .exists(),
+            ).where(Event.id == event_id)
+        )
+        row = result.first()
+        if row is None:
+            return NOT_FOUND, None
+        requires_registration, dup = row
+        if not requires_registration:
+            return CLOSED, None
+        return (DUPLICATE if dup else FULL), None
+
+    await session.commit()
+    response_cache.invalidate("events")
+
+    if event.slots_available is None:
+        return REGISTERED, None
+    return REGISTERED, event.slots_available - event.registered_count
+
+
+async def register_batch(session: AsyncSession, event_id, user_ids) -> list:
+    """
+    Register a batch of users for one event in a single transaction.
+    Users win slots in list order; returns one (outcome, slots_remaining)
+    per entry of user_ids.
+    """
+    locked = await session.execute(
+        select(Event.requires_registration, Event.slots_available, Event.registered_count)
+        .where(Event.id == event_id)
+        .with_for_update()
+    )
+    event = locked.first()
+    if event is None or not event.requires_registration:
+        await session.rollback()
+        outcome = NOT_FOUND if event is None else CLOSED
+        return [(outcome, None)] * len(user_ids)
+
+    # Read after the lock is held, so no other registration is in flight
+    existing = await session.execute(
+        select(Participant.user_id).where(
+            Participant.event_id == event_id,
+            Participant.user_id.in_(set(user_ids)),
+        )
+    )
+    taken = set(existing.scalars().all())
+
+    results = []
+    winners = []
+    count = event.registered_count
+    for user_id in user_ids:
+        if user_id in taken:
+            results.append((DUPLICATE, None))
+        elif event.slots_available is not None and count >= event.slots_available:
+            results.append((FULL, None))
+        else:
+            taken.add(user_id)
+            winners.append({"event_id": event_id, "user_id": user_id})
+            count += 1
+            results.append((REGISTERED, None))
+
+    if not winners:
+        await session.rollback()
+        return results
+
+    # A winner can still conflict with a row inserted outside the
+    # queue (admin registration) since the read above
+    inserted = await session.execute(
+        insert_participants().values(winners).returning(Participant.user_id)
+    )
+    inserted = set(inserted.scalars().all())
+
+    # slots_remaining counts only the rows that were actually inserted
+    count = event.registered_count
+    for i, (user_id, (outcome, _)) in enumerate(zip(user_ids, results)):
+        if outcome != REGISTERED:
+            continue
+        if user_id not in inserted:
+            results[i] = (DUPLICATE, None)
+            continue
+        count += 1
+        remaining = None if event.slots_available is None else event.slots_available - count
+        results[i] = (REGISTERED, remaining)
+
+    if not inserted:
+        await session.rollback()
+        return results
+
+    await adjust_registered_count(session, event_id, len(inserted))
+    await session.commit()
+    response_cache.invalidate("events")
+    return results
+
+
+# ---------------------------------------------------------
+# VERSION (validators for conditional GET)
+# Media and schedule rows have no updated_at, so their count
+# and newest timestamp stand in for it. Registrations pin
+# events.updated_at, so registered_count is part of both.
+# ---------------------------------------------------------
+def _child_version(event_id_column, timestamp):
+    return (
+        select(func.count()).where(event_id_column == Event.id).scalar_subquery(),
+        select(func.max(timestamp)).where(event_id_column == Event.id).scalar_subquery(),
+    )
+
+
+async def version(session: AsyncSession, event_id):
+    stmt = select(
+        Event.updated_at,
+        Event.registered_count,
+        *_child_version(EventMedia.event_id, EventMedia.uploaded_at),
+        *_child_version(Recurrence.event_id, Recurrence.updated_at),
+        *_child_version(Schedule.event_id, Schedule.created_at),
+    ).where(Event.id == event_id)
+
+    result = await session.execute(stmt)
+    row = result.one_or_none()
+    return tuple(row) if row else None
+
+
+async def list_version(session: AsyncSession):
+    """
+    One row for every list page: count and max(updated_at) of events,
+    an order-independent fingerprint of the per-event counters (a
+    registration moving from one event to another keeps the sum), and
+    the media count and newest upload behind thumbnail_url and media.
+    """
+    stmt = select(
+        func.count(Event.id),
+        func.max(Event.updated_at),
+        func.bit_xor(func.hashtext(func.concat(Event.id, ":", Event.registered_count))),
+        select(func.count(EventMedia.id)).scalar_subquery(),
+        select(func.max(EventMedia.uploaded_at)).scalar_subquery(),
+    )
+    result = await session.execute(stmt)
+    return tuple(result.one())
+
+
+# ---------------------------------------------------------
+# SEARCH HELPERS
+# ---------------------------------------------------------
+SEARCH_CONFIG = "simple"
+
+
+def build_search_query(q: Optional[str]) -> Optional[str]:
+    """
+    Turn free text into a prefix tsquery ("gotong roy" -> "gotong:* & roy:*")
+    so partial words match while typing. Returns None when q has no words.
+    """
+    if not q:
+        return None
+
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+
+    return " & ".join(f"{w}:*" for w in words)
+
+
+# ---------------------------------------------------------
+# LIST EVENTS ("list" PROFILE, KEYSET PAGINATED)
 # ---------------------------------------------------------
 async def list_events(
     session: AsyncSession,
     q: Optional[str] = None,
-    upcoming: bool = False
+    upcoming: bool = False,
+    limit: int = 50,
+    after: Optional[Tuple[datetime, UUID, Optional[float]]] = None,
+    options=None,
 ):
-    stmt = (
-        select(Event)
-        .options(
-            selectinload(Event.media),         # posters
-            selectinload(Event.recurrence)     # recurrence object
+    """
+    Returns (events, last_key) where last_key is the (event_date, id, rank)
+    of the final row when another page exists, otherwise None.
+
+    Plain listings are ordered by (event_date, id). Searches are ordered by
+    relevance first, and rank is carried in the key for the next page.
+    `options` replaces the "list" loader profile, e.g. for sparse fieldsets.
+    """
+    tsquery = build_search_query(q)
+
+    if tsquery:
+        ts = func.to_tsquery(SEARCH_CONFIG, tsquery)
+        rank = func.ts_rank(Event.search_vector, ts, type_=Float)
+        stmt = (
+            select(Event, rank.label("rank"))
+            .where(Event.search_vector.op("@@")(ts))   # ix_events_search_vector
+            .order_by(rank.desc(), Event.event_date.asc(), Event.id.asc())
         )
-    )
+    else:
+        rank = None
+        stmt = select(Event).order_by(Event.event_date.asc(), Event.id.asc())
+
+    if options is None:
+        options = event_load_options("list")
+    stmt = stmt.options(*options).limit(limit + 1)
+
+    # seek past the previous page (uses ix_events_event_date_id)
+    if after:
+        after_date, after_id, after_rank = after
+        seek = tuple_(Event.event_date, Event.id) > tuple_(after_date, after_id)
+        if rank is not None and after_rank is not None:
+            seek = or_(rank < after_rank, and_(rank == after_rank, seek))
+        stmt = stmt.where(seek)
 
     # filter: upcoming only
     if upcoming:
         stmt = stmt.where(Event.event_date >= func.now())
 
-    # filter: search
-    if q:
-        like = f"%{q}%"
-        stmt = stmt.where(
-            or_(Event.title.ilike(like), Event.description.ilike(like))
+    result = await session.execute(stmt)
+
+    if rank is not None:
+        rows = [(row[0], row.rank) for row in result.all()]
+    else:
+        rows = [(ev, None) for ev in result.scalars().all()]
+
+    events = [ev for ev, _ in rows[:limit]]
+
+    if len(rows) <= limit:
+        return events, None
+
+    last, last_rank = rows[limit - 1]
+    return events, (last.event_date, last.id, last_rank)
+
+
+
+# ---------------------------------------------------------
+# CALENDAR (one row per local day, events packed by Postgres)
+# ---------------------------------------------------------
+async def calendar_days(session: AsyncSession, start: date, end: date, tz_name: str):
+    """
+    Events from `start` to `end` (inclusive, local dates in tz_name),
+    grouped per local day with only what a calendar cell shows.
+    """
+    tz = ZoneInfo(tz_name)
+    lower = datetime.combine(start, time.min, tzinfo=tz)
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz)
+
+    day = cast(func.date_trunc("day", func.timezone(tz_name, Event.event_date)), Date).label("date")
+    cell = func.jsonb_build_object(
+        "id", Event.id,
+        "title", Event.title,
+        "location", Event.location,
+        "event_date", Event.event_date,
+        "is_cancelled", Event.is_cancelled,
+    )
+
+    stmt = (
+        select(
+            day,
+            func.count(Event.id).label("count"),
+            func.jsonb_agg(aggregate_order_by(cell, Event.event_date), type_=JSONB).label("events"),
         )
+        .where(Event.event_date >= lower, Event.event_date < upper)   # ix_events_event_date_id
+        .group_by(day)
+        .order_by(day)
+    )
 
     result = await session.execute(stmt)
-    return result.scalars().all()
\ No newline at end of file
+    return [row._asdict() for row in result.all()]
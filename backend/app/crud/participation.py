@@ -3,26 +3,46 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.participant import Participant
 from fastapi import HTTPException
 from app.models.user import User
+from app.core.cache import response_cache
+from app.crud import event as crud_event
+from app.crud import role as crud_role
 
 
 # ---------------------------------------------------------
 # CREATE
 # ---------------------------------------------------------
 async def create_participant(session, data):
-    # Prevent duplicates
-    existing = await session.execute(
-        select(Participant).where(
-            Participant.event_id == data["event_id"],
-            Participant.user_id == data["user_id"],
-        )
+    data = dict(data)
+    role_id = data.pop("role_id", None)
+
+    # Duplicates are rejected by uq_participants_event_user
+    result = await session.execute(
+        crud_event.insert_participants().values(**data).returning(Participant)
     )
-    if existing.scalars().first():
+    participant = result.scalars().first()
+    if participant is None:
+        await session.rollback()
         raise HTTPException(400, "User already registered in event")
 
-    participant = Participant(**data)
-    session.add(participant)
+    # role_id goes through the same slots check as any other assignment;
+    # the role lock is taken before the event row, as in assign_role
+    if role_id is not None:
+        outcome, _ = await crud_role.assign_participant(session, role_id, participant.id, commit=False)
+        if outcome != crud_role.ASSIGNED:
+            await session.rollback()
+            if outcome == crud_role.ROLE_NOT_FOUND:
+                raise HTTPException(404, detail="Peran tidak ditemukan")
+            if outcome == crud_role.ROLE_FULL:
+                raise HTTPException(400, detail="Penugasan sudah penuh")
+            raise HTTPException(400, detail="Peran bukan milik acara ini")
+
+    await crud_event.adjust_registered_count(session, data["event_id"], 1)
     await session.commit()
-    await session.refresh(participant)
+    if role_id is not None:
+        await session.refresh(participant)   # role_id was set by a bulk UPDATE
+        response_cache.invalidate("roles", "events")
+    else:
+        response_cache.invalidate("events")
     return participant
 
 
@@ -53,6 +73,9 @@ async def list_participants(session: AsyncSession, event_id: str):
     return results
 
 async def list_participants_with_user(session, event_id: str):
+    return await list_participants_for_events(session, [event_id])
+
+async def list_participants_for_events(session, event_ids):
     q = await session.execute(
         select(
             Participant.id,
@@ -64,7 +87,7 @@ async def list_participants_with_user(session, event_id: str):
             User.email,
             User.phone
         ).join(User, User.id == Participant.user_id)
-        .where(Participant.event_id == event_id)
+        .where(Participant.event_id.in_(list(event_ids)))
     )
     rows = q.all()
     return [
@@ -85,13 +108,11 @@ async def list_participants_with_user(session, event_id: str):
 # ASSIGN ROLE
 # ---------------------------------------------------------
 async def assign_role(session: AsyncSession, participant_id: str, role_id: str):
-    p = await session.get(Participant, participant_id)
-    if not p:
-        return None
-
-    p.role_id = role_id
-    await session.commit()
-    await session.refresh(p)
+    outcome, p = await crud_role.assign_participant(session, role_id, participant_id)
+    if outcome == crud_role.ROLE_NOT_FOUND:
+        raise HTTPException(404, "Role not found")
+    if outcome == crud_role.ROLE_FULL:
+        raise HTTPException(400, detail="Penugasan sudah penuh")
     return p
 
 
@@ -106,6 +127,7 @@ async def unassign_role(session: AsyncSession, participant_id: str):
     p.role_id = None
     await session.commit()
     await session.refresh(p)
+    response_cache.invalidate("roles")
     return p
 
 
@@ -118,5 +140,7 @@ async def delete_participant(session: AsyncSession, participant_id: str):
         return None
 
     await session.delete(p)
+    await crud_event.adjust_registered_count(session, p.event_id, -1)
     await session.commit()
+    response_cache.invalidate("events", "roles")
     return True
\ No newline at end of file
@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from app.models.recurrence import Recurrence
+from app.core.cache import response_cache
 
 
 # ---------------------------------------------------------
@@ -12,6 +13,7 @@ async def create_recurrence(session: AsyncSession, data):
     session.add(rec)
     await session.commit()
     await session.refresh(rec)
+    response_cache.invalidate("events")
     return rec
 
 
@@ -59,6 +61,7 @@ async def update_recurrence(session: AsyncSession, id, updates: dict):
 
     await session.commit()
     await session.refresh(rec)
+    response_cache.invalidate("events")
     return rec
 
 
@@ -72,4 +75,5 @@ async def delete_recurrence(session: AsyncSession, id):
 
     await session.delete(rec)
     await session.commit()
+    response_cache.invalidate("events")
     return True
\ No newline at end of file
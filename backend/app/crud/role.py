@@ -1,29 +1,55 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update
+from sqlalchemy import update, delete
 from app.models.role import Role
 from app.models.participant import Participant
 from fastapi import HTTPException
-from sqlalchemy import func
+from sqlalchemy import func, or_, cast, literal, literal_column, values, column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import aliased, with_expression
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.cache import response_cache
+from app.crud import event as crud_event
 
 async def create_role(session: AsyncSession, role_data: dict):
     role = Role(**role_data)
     session.add(role)
     await session.commit()
     await session.refresh(role)
+    response_cache.invalidate("roles")
     return role
 
+def _with_slots_filled(stmt):
+    # one grouped query; served by ix_participants_role_id
+    return (
+        stmt.outerjoin(Participant, Participant.role_id == Role.id)
+        .group_by(Role.id)
+        .options(with_expression(Role.slots_filled, func.count(Participant.id)))
+    )
+
 async def list_roles(session: AsyncSession, event_id: str):
-    result = await session.execute(select(Role).where(Role.event_id == event_id))
+    result = await session.execute(_with_slots_filled(select(Role).where(Role.event_id == event_id)))
     return result.scalars().all()
 
 async def delete_role(session: AsyncSession, role_id: str):
-    result = await session.execute(select(Role).where(Role.id == role_id))
+    # Locked so no assignment lands between the two deletes
+    result = await session.execute(select(Role).where(Role.id == role_id).with_for_update())
     role = result.scalar_one_or_none()
     if not role:
+        await session.rollback()
         return None
+
+    # Role holders are removed with the role; keep registered_count in step
+    removed = await session.execute(
+        delete(Participant).where(Participant.role_id == role.id).returning(Participant.id)
+    )
+    n_removed = len(removed.all())
+    if n_removed:
+        await crud_event.adjust_registered_count(session, role.event_id, -n_removed)
+
     await session.delete(role)
     await session.commit()
+    response_cache.invalidate("roles", "events")
     return role
 
 async def update_role(session, role_id, data):
@@ -36,6 +62,7 @@ async def update_role(session, role_id, data):
 
     await session.commit()
     await session.refresh(role)  
+    response_cache.invalidate("roles")
 
     return role
 
@@ -43,32 +70,221 @@ async def get_role(session: AsyncSession, role_id: str):
     result = await session.execute(select(Role).where(Role.id == role_id))
     return result.scalar_one_or_none()
 
-async def assign_role(session, role_id, user_id, event_id):
-    # Count current assignments
-    count = await session.execute(
-        select(func.count()).select_from(Participant).where(Participant.role_id == role_id)
+# ---------------------------------------------------------
+# ASSIGNMENT (the only path that sets participants.role_id)
+#
+# The role row is locked (and its updated_at bumped, which also
+# moves the list ETag) before a single conditional write checks
+# slots_required. The check runs as its own statement so its
+# snapshot includes assignments committed by the previous lock
+# holder.
+# ---------------------------------------------------------
+ASSIGNED = "assigned"
+ROLE_NOT_FOUND = "role_not_found"
+PARTICIPANT_NOT_FOUND = "participant_not_found"
+ROLE_FULL = "role_full"
+
+
+async def _lock_role(session: AsyncSession, role_id):
+    result = await session.execute(
+        update(Role)
+        .where(Role.id == role_id)
+        .values(updated_at=func.now())
+        .returning(Role.id, Role.event_id, Role.slots_required)
     )
-    current_filled = count.scalar()
+    return result.first()
 
-    # Get role
-    role = await session.get(Role, role_id)
 
-    if current_filled >= role.slots_required:
-        raise HTTPException(400, detail="Penugasan sudah penuh")
+def _has_room(role, holder=None):
+    """SQL condition: the role has a free slot, or `holder` already has it."""
+    assigned = aliased(Participant)
+    filled = (
+        select(func.count(assigned.id))
+        .where(assigned.role_id == role.id)
+        .scalar_subquery()
+    )
+    room = filled < role.slots_required
+    if holder is not None:
+        room = or_(room, holder.role_id == role.id)
+    return room
+
 
-    # Assign
-    participant = Participant(
-        event_id=event_id,
-        user_id=user_id,
-        role_id=role_id
+async def assign_participant(session: AsyncSession, role_id, participant_id, commit: bool = True):
+    """
+    Give an existing participant the role. Returns (outcome, participant).
+    With commit=False the caller owns the transaction: nothing is
+    committed or rolled back here.
+    """
+    role = await _lock_role(session, role_id)
+    if role is None:
+        if commit:
+            await session.rollback()
+        return ROLE_NOT_FOUND, None
+
+    result = await session.execute(
+        update(Participant)
+        .where(
+            Participant.id == participant_id,
+            Participant.event_id == role.event_id,
+            _has_room(role, Participant),
+        )
+        .values(role_id=role.id)
+        .returning(Participant)
+        .execution_options(synchronize_session=False)
     )
-    session.add(participant)
+    participant = result.scalars().first()
+
+    if participant is None:
+        if commit:
+            await session.rollback()
+        exists = await session.execute(
+            select(Participant.id).where(
+                Participant.id == participant_id,
+                Participant.event_id == role.event_id,
+            )
+        )
+        return (ROLE_FULL if exists.first() else PARTICIPANT_NOT_FOUND), None
+
+    if commit:
+        await session.commit()
+        response_cache.invalidate("roles")
+    return ASSIGNED, participant
+
+
+async def assign_role(session, role_id, user_id, event_id):
+    """Register user_id for the event if needed and give them the role."""
+    role = await _lock_role(session, role_id)
+    if role is None:
+        await session.rollback()
+        raise HTTPException(404, detail="Peran tidak ditemukan")
+
+    holder = aliased(Participant)
+    already_holds = (
+        select(holder.id)
+        .where(holder.event_id == event_id, holder.user_id == user_id, holder.role_id == role.id)
+        .exists()
+    )
+    stmt = pg_insert(Participant).from_select(
+        ["event_id", "user_id", "role_id"],
+        select(
+            literal(event_id, Participant.event_id.type),
+            literal(user_id, Participant.user_id.type),
+            literal(role.id, Participant.role_id.type),
+        ).where(or_(_has_room(role), already_holds)),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Participant.event_id, Participant.user_id],
+        set_={"role_id": stmt.excluded.role_id},
+    ).returning(Participant, literal_column("xmax = 0").label("inserted"))
+    row = (await session.execute(stmt)).first()
+
+    if row is None:
+        await session.rollback()
+        raise HTTPException(400, detail="Penugasan sudah penuh")
+
+    participant, inserted = row
+    if inserted:
+        await crud_event.adjust_registered_count(session, event_id, 1)
     await session.commit()
-    await session.refresh(participant)
+    response_cache.invalidate("roles", "events")
 
     return participant
 
+async def assign_many(session: AsyncSession, assignments: dict) -> set:
+    """
+    Apply {participant_id: role_id or None} in one transaction.
+    Returns the event ids touched; raises HTTPException (nothing is
+    written) for unknown roles or participants, a role from another
+    event, or a role that would exceed slots_required.
+    """
+    role_ids = sorted({r for r in assignments.values() if r is not None})
+
+    # Lock the roles in a stable order so concurrent batches cannot deadlock
+    roles = {}
+    if role_ids:
+        locked = (
+            select(Role.id)
+            .where(Role.id.in_(role_ids))
+            .order_by(Role.id)
+            .with_for_update()
+            .subquery()
+        )
+        result = await session.execute(
+            update(Role)
+            .where(Role.id == locked.c.id)
+            .values(updated_at=func.now())
+            .returning(Role.id, Role.event_id, Role.slots_required)
+        )
+        roles = {row.id: row for row in result.all()}
+
+    missing = [str(r) for r in role_ids if r not in roles]
+    if missing:
+        await session.rollback()
+        raise HTTPException(404, detail={"code": "ROLE_NOT_FOUND", "message": "Peran tidak ditemukan", "roles": missing})
+
+    # Capacity: current holders outside this batch, one grouped query
+    if role_ids:
+        result = await session.execute(
+            select(Participant.role_id, func.count(Participant.id))
+            .where(Participant.role_id.in_(role_ids), Participant.id.not_in(list(assignments)))
+            .group_by(Participant.role_id)
+        )
+        filled = dict(result.all())
+        for role_id in assignments.values():
+            if role_id is not None:
+                filled[role_id] = filled.get(role_id, 0) + 1
+
+        full = [str(r) for r in role_ids if filled[r] > roles[r].slots_required]
+        if full:
+            await session.rollback()
+            raise HTTPException(400, detail={"code": "ROLE_FULL", "message": "Penugasan sudah penuh", "roles": full})
+
+    # Apply: UPDATE ... FROM (VALUES ...)
+    mapping = values(
+        column("participant_id", PG_UUID(as_uuid=True)),
+        column("role_id", PG_UUID(as_uuid=True)),
+        name="mapping",
+    ).data(list(assignments.items()))
+    result = await session.execute(
+        update(Participant)
+        .where(Participant.id == mapping.c.participant_id)
+        .values(role_id=cast(mapping.c.role_id, PG_UUID(as_uuid=True)))   # an all-NULL column would be text
+        .returning(Participant.id, Participant.event_id, Participant.role_id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.all()
+
+    found = {row.id for row in updated}
+    missing = [str(p) for p in assignments if p not in found]
+    if missing:
+        await session.rollback()
+        raise HTTPException(404, detail={"code": "PARTICIPANT_NOT_FOUND", "message": "Peserta tidak ditemukan", "participants": missing})
+
+    mismatched = [str(row.id) for row in updated if row.role_id is not None and roles[row.role_id].event_id != row.event_id]
+    if mismatched:
+        await session.rollback()
+        raise HTTPException(400, detail={"code": "ROLE_EVENT_MISMATCH", "message": "Peran bukan milik acara peserta", "participants": mismatched})
+
+    await session.commit()
+    response_cache.invalidate("roles")
+    return {row.event_id for row in updated}
+
+async def collection_version(session: AsyncSession, event_id=None):
+    # assignments bump the role's updated_at; the assigned count covers
+    # participants that disappear (unregister, user deletion)
+    assigned = select(func.count(Participant.id)).where(Participant.role_id.is_not(None))
+    stmt = select(func.max(Role.updated_at), func.count(Role.id))
+    if event_id:
+        stmt = stmt.where(Role.event_id == event_id)
+        assigned = assigned.where(Participant.event_id == event_id)
+    stmt = stmt.add_columns(assigned.scalar_subquery())
+    result = await session.execute(stmt)
+    return tuple(result.one())
+
+async def version(session: AsyncSession, role_id):
+    result = await session.execute(select(Role.updated_at).where(Role.id == role_id))
+    return result.scalar_one_or_none()
+
 async def list_all_roles(session: AsyncSession):
-    from app.models.role import Role
-    result = await session.execute(select(Role))
+    result = await session.execute(_with_slots_filled(select(Role)))
     return result.scalars().all()
\ No newline at end of file
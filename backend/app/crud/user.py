@@ -1,5 +1,8 @@
+from functools import lru_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.user import User
 from app.core.security import get_password_hash, verify_password
 
@@ -47,4 +50,52 @@ async def find_by_email_or_phone(session, email: str, phone: str):
             (User.email == email) | (User.phone == phone)
         )
     )
-    return q.scalars().first()
\ No newline at end of file
+    return q.scalars().first()
+
+# Password given to users an admin registers on their behalf
+DEFAULT_PASSWORD = "defaultpassword123"
+
+@lru_cache(maxsize=1)
+def default_password_hash() -> str:
+    # bcrypt is slow on purpose; bulk paths hash once per process
+    return get_password_hash(DEFAULT_PASSWORD)
+
+async def find_by_emails_or_phones(session: AsyncSession, emails, phones):
+    emails, phones = list(emails), list(phones)
+    if not emails and not phones:
+        return []
+    q = await session.execute(
+        select(User.id, User.email, User.phone).where(
+            or_(User.email.in_(emails), User.phone.in_(phones))
+        )
+    )
+    return q.all()
+
+async def bulk_create_users(session: AsyncSession, users: list):
+    """
+    Insert users in one statement, skipping any whose email or phone
+    is already taken. Returns (id, email, phone) of the rows created.
+    Does not commit.
+    """
+    if not users:
+        return []
+    q = await session.execute(
+        pg_insert(User)
+        .values([
+            {"hashed_password": default_password_hash(), "is_admin": False, **u}
+            for u in users
+        ])
+        .on_conflict_do_nothing()
+        .returning(User.id, User.email, User.phone)
+    )
+    return q.all()
+
+async def collection_version(session: AsyncSession):
+    result = await session.execute(
+        select(func.max(User.updated_at), func.count(User.id))
+    )
+    return tuple(result.one())
+
+async def version(session: AsyncSession, user_id):
+    result = await session.execute(select(User.updated_at).where(User.id == user_id))
+    return result.scalar_one_or_none()
@@ -4,10 +4,10 @@ import logging
 from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database.session import init_db
+from app.database.session import init_db, AsyncSessionLocal
 from app.routes import (
     event,
     announcement,
@@ -20,6 +20,12 @@ from app.routes import (
     attendance,
 )
 from app.services.recurrence_engine import generate_recurring_events
+from app.crud.event import reconcile_registered_counts
+from app.core.cache import response_cache
+from app.core.deps import require_admin_user
+from app.services.registration_queue import registration_queue
+from app.services.report_jobs import report_jobs
+from app.core.compression import CompressionMiddleware
 
 
 # ------------------------------------------------------
@@ -36,6 +42,12 @@ RUN_GENERATE_ON_STARTUP = os.getenv("RUN_GENERATE_ON_STARTUP", "true").lower() i
 )
 RECURRENCE_INTERVAL_SECONDS = int(os.getenv("RECURRENCE_INTERVAL_SECONDS", 86400))
 
+ENABLE_COUNT_RECONCILER = os.getenv("ENABLE_COUNT_RECONCILER", "true").lower() in (
+    "1",
+    "true",
+)
+COUNT_RECONCILE_INTERVAL_SECONDS = int(os.getenv("COUNT_RECONCILE_INTERVAL_SECONDS", 3600))
+
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
 
@@ -71,6 +83,47 @@ async def _recurrence_loop(interval_seconds: int, stop_event: asyncio.Event):
         logger.info("[Worker] Recurrence loop stopped")
 
 
+# ------------------------------------------------------
+# Registered-count Reconciliation Loop
+# ------------------------------------------------------
+
+async def _reconcile_loop(interval_seconds: int, stop_event: asyncio.Event):
+    logger.info(f"[Worker] Count reconciliation started (interval={interval_seconds}s)")
+
+    try:
+        while not stop_event.is_set():
+            try:
+                async with AsyncSessionLocal() as session:
+                    fixed = await reconcile_registered_counts(session)
+                if fixed:
+                    logger.warning("[Worker] Repaired registered_count on %d events", len(fixed))
+            except Exception as exc:
+                logger.exception("[Worker] Error reconciling registered counts: %s", exc)
+
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+            except asyncio.TimeoutError:
+                continue
+
+    finally:
+        logger.info("[Worker] Count reconciliation stopped")
+
+
+async def _stop_worker(name: str, task: asyncio.Task, stop_event: asyncio.Event):
+    logger.info(f"Shutting down {name}...")
+    stop_event.set()
+    try:
+        await asyncio.wait_for(task, timeout=10)
+        logger.info(f"{name} stopped gracefully")
+    except asyncio.TimeoutError:
+        logger.warning(f"{name} did not stop in time; cancelling...")
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            logger.info(f"{name} force-cancelled")
+
+
 # ------------------------------------------------------
 # Application Lifespan
 # ------------------------------------------------------
@@ -105,24 +158,28 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Recurrence worker disabled")
 
+    reconcile_stop: Optional[asyncio.Event] = None
+    reconcile_task: Optional[asyncio.Task] = None
+
+    if ENABLE_COUNT_RECONCILER:
+        reconcile_stop = asyncio.Event()
+        reconcile_task = asyncio.create_task(
+            _reconcile_loop(COUNT_RECONCILE_INTERVAL_SECONDS, reconcile_stop)
+        )
+        app.state.reconcile_task = reconcile_task
+    else:
+        logger.info("Count reconciliation disabled")
+
     # yield to application
     try:
         yield
     finally:
         # Graceful shutdown
         if worker_task:
-            logger.info("Shutting down recurrence worker...")
-            stop_event.set()
-            try:
-                await asyncio.wait_for(worker_task, timeout=10)
-                logger.info("Recurrence worker stopped gracefully")
-            except asyncio.TimeoutError:
-                logger.warning("Worker did not stop in time; cancelling...")
-                worker_task.cancel()
-                try:
-                    await worker_task
-                except asyncio.CancelledError:
-                    logger.info("Worker force-cancelled")
+            await _stop_worker("Recurrence worker", worker_task, stop_event)
+        if reconcile_task:
+            await _stop_worker("Count reconciliation", reconcile_task, reconcile_stop)
+        await report_jobs.close()
 
 
 # ------------------------------------------------------
@@ -154,6 +211,14 @@ app.add_middleware(
 )
 
 
+# ------------------------------------------------------
+# Response Compression (gzip, or br when the brotli wheel is installed)
+# ------------------------------------------------------
+
+# Threshold and levels: COMPRESS_MIN_SIZE, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY
+app.add_middleware(CompressionMiddleware)
+
+
 # ------------------------------------------------------
 # Routers
 # ------------------------------------------------------
@@ -196,6 +261,33 @@ async def run_recurrences_now():
         return {"success": False, "error": str(exc)}
 
 
+# ------------------------------------------------------
+# Response Cache Stats (for sizing CACHE_MAX_ENTRIES / CACHE_TTL_SECONDS)
+# ------------------------------------------------------
+
+@app.get("/internal/cache/stats")
+async def cache_stats(current_user=Depends(require_admin_user)):
+    return {"success": True, "data": response_cache.stats()}
+
+
+# ------------------------------------------------------
+# Registration Queue Stats (batches vs requests during a burst)
+# ------------------------------------------------------
+
+@app.get("/internal/registrations/stats")
+async def registration_stats(current_user=Depends(require_admin_user)):
+    return {"success": True, "data": registration_queue.stats()}
+
+
+# ------------------------------------------------------
+# Report Job Stats (dedup hits and spool usage)
+# ------------------------------------------------------
+
+@app.get("/internal/reports/stats")
+async def report_stats(current_user=Depends(require_admin_user)):
+    return {"success": True, "data": report_jobs.stats()}
+
+
 # ------------------------------------------------------
 # Local Development Entrypoint
 # ------------------------------------------------------
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, DateTime, Date, Text, text, Computed
+from sqlalchemy import Column, ForeignKey, DateTime, Date, Integer, Text, text, Computed, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -6,6 +6,12 @@ from app.database.base import Base
 
 class Attendance(Base):
     __tablename__ = "attendances"
+    __table_args__ = (
+        # per-event listings and date-range reports
+        Index("ix_attendances_event_id_attendance_day", "event_id", "attendance_day"),
+        # one check-in per participant per day; bulk check-in relies on it
+        UniqueConstraint("event_id", "participant_id", "attendance_day", name="uq_attendance_unique_daily"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -14,7 +20,7 @@ class Attendance(Base):
     )
 
     event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
-    participant_id = Column(UUID(as_uuid=True), ForeignKey("participants.id", ondelete="CASCADE"), nullable=False)
+    participant_id = Column(UUID(as_uuid=True), ForeignKey("participants.id", ondelete="CASCADE"), nullable=False, index=True)
 
     attended_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -25,4 +31,30 @@ class Attendance(Base):
     notes = Column(Text, nullable=True)
 
     event = relationship("Event")
-    participant = relationship("Participant")
\ No newline at end of file
+    participant = relationship("Participant")
+
+
+class AttendanceSyncKey(Base):
+    """Idempotency keys of offline check-ins already applied by /attendance/sync."""
+    __tablename__ = "attendance_sync_keys"
+
+    key = Column(UUID(as_uuid=True), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+
+
+class AttendanceRollup(Base):
+    """
+    Attendance per event, participant and month, kept in step with
+    attendances by app.crud.attendance in the same transaction.
+    Rebuild with scripts/rebuild_attendance_rollups.py.
+    """
+    __tablename__ = "attendance_rollups"
+
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    participant_id = Column(UUID(as_uuid=True), ForeignKey("participants.id", ondelete="CASCADE"), primary_key=True, index=True)
+    month = Column(Date, primary_key=True, index=True)   # first day of the month
+
+    attended_count = Column(Integer, nullable=False, server_default=text("0"))
+    first_attended_at = Column(DateTime(timezone=True), nullable=True)
+    last_attended_at = Column(DateTime(timezone=True), nullable=True)
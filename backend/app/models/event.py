@@ -1,12 +1,18 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import func
 from app.database.base import Base
 from sqlalchemy import text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, query_expression
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # keyset pagination + upcoming filter: ORDER BY event_date, id
+        Index("ix_events_event_date_id", "event_date", "id"),
+        # full-text search over title + description
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
 
@@ -16,9 +22,21 @@ class Event(Base):
     location = Column(String(200))
     event_date = Column(DateTime(timezone=True), nullable=False)
 
+    # Maintained by Postgres; 'simple' config so Indonesian words are not stemmed as English
+    # Deferred: only ever used in WHERE/ORDER BY, never loaded
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+    ))
+
     # Capacity (registration only)
     requires_registration = Column(Boolean, default=False)
     slots_available = Column(Integer, nullable=True)  # capacity per event
+    # participants rows, kept in step by every insert/delete (see crud.event)
+    registered_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
     
     # Event status
     is_cancelled = Column(Boolean, default=False)
@@ -26,10 +44,14 @@ class Event(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), nullable=False)
 
+    # First banner URL, filled per query via crud.event.THUMBNAIL_URL
+    thumbnail_url = query_expression()
+
     # Relationships
-    schedules = relationship("Schedule", back_populates="event", cascade="all, delete", lazy="selectin")
-    participants = relationship("Participant", back_populates="event", cascade="all, delete", lazy="selectin")
-    roles = relationship("Role", back_populates="event", cascade="all, delete", lazy="selectin")
-    media = relationship("EventMedia", back_populates="event", lazy="selectin", cascade="all, delete")
-    recurrence = relationship("Recurrence", back_populates="event", uselist=False, lazy="selectin", cascade="all, delete")
-    attendances = relationship("Attendance", back_populates="event", cascade="all, delete", lazy="selectin")
\ No newline at end of file
+    # Nothing is eager here: queries opt in through crud.event.EVENT_LOAD_PROFILES
+    schedules = relationship("Schedule", back_populates="event", cascade="all, delete")
+    participants = relationship("Participant", back_populates="event", cascade="all, delete")
+    roles = relationship("Role", back_populates="event", cascade="all, delete")
+    media = relationship("EventMedia", back_populates="event", cascade="all, delete")
+    recurrence = relationship("Recurrence", back_populates="event", uselist=False, cascade="all, delete")
+    attendances = relationship("Attendance", back_populates="event", cascade="all, delete")
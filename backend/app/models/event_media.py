@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
@@ -6,6 +6,10 @@ from app.database.base import Base
 
 class EventMedia(Base):
     __tablename__ = "event_media"
+    __table_args__ = (
+        # media per event, oldest first (thumbnail_url subquery)
+        Index("ix_event_media_event_id_uploaded_at", "event_id", "uploaded_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
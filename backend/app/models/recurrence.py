@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
@@ -6,11 +6,15 @@ from app.database.base import Base
 
 class Recurrence(Base):
     __tablename__ = "recurrences"
+    __table_args__ = (
+        # the recurrence worker only reads active rows
+        Index("ix_recurrences_active", "active", postgresql_where=text("active")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
 
     # Link to the parent event template
-    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # The initial event date that recurrence starts from
     start_date = Column(DateTime(timezone=True), nullable=False)
@@ -1,14 +1,14 @@
 from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func, text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from app.database.base import Base
 
 class Role(Base):
     __tablename__ = "roles"
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
-    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
 
     role_name = Column(String(100), nullable=False)
     description = Column(Text)
@@ -18,5 +18,8 @@ class Role(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # participants holding the role; only populated by crud.role list queries
+    slots_filled = query_expression()
+
     event = relationship("Event", back_populates="roles")
     participants = relationship("Participant", back_populates="role", cascade="all, delete")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import Optional
 from app.core.deps import require_admin_user
 from app.database.session import get_session
@@ -7,6 +7,10 @@ from app.models.announcement import Announcement
 from app.schemas.announcement import AnnouncementCreate, AnnouncementOut
 from app.models.announcement import Announcement
 from app import crud
+from app.core.cache import response_cache
+from app.core.conditional import make_etag, not_modified
+from app.core.compression import PrecompressedBody
+from app.core.responses import cached_json_response, envelope, envelope_response, serialize
 from uuid import UUID
 
 router = APIRouter()
@@ -14,19 +18,38 @@ router = APIRouter()
 @router.post('', response_model=dict)
 async def create_announcement(payload: AnnouncementCreate, current_user = Depends(require_admin_user), session: AsyncSession = Depends(get_session)):
     a = await crud.announcement.create_announcement(session, payload.title, payload.body)
-    return {'success': True, 'data': AnnouncementOut.from_orm(a).dict()}
+    return envelope_response(AnnouncementOut, a)
 
 @router.get('', response_model=dict)
-async def list_announcements(session: AsyncSession = Depends(get_session)):
-    rows = await crud.announcement.list_announcements(session)
-    return {'success': True, 'data': [AnnouncementOut.from_orm(r).dict() for r in rows]}
+async def list_announcements(request: Request, response: Response, session: AsyncSession = Depends(get_session)):
+    version = await crud.announcement.collection_version(session)
+    unchanged = not_modified(request, response, make_etag("announcements", *version))
+    if unchanged:
+        return unchanged
+
+    async def load():
+        rows = await crud.announcement.list_announcements(session)
+        return PrecompressedBody(envelope(serialize(AnnouncementOut, rows, many=True)))
+
+    body = await response_cache.get_or_load(("announcements", "list"), load)
+    return cached_json_response(request, body, response.headers)
 
 @router.get("/{id}", response_model=dict)
-async def get_announcement(id: UUID, session: AsyncSession = Depends(get_session)):
-    row = await session.get(Announcement, id)
-    if not row:
-        raise HTTPException(status_code=404, detail="Announcement not found")
-    return {"success": True, "data": AnnouncementOut.from_orm(row).dict()}
+async def get_announcement(id: UUID, request: Request, response: Response, session: AsyncSession = Depends(get_session)):
+    updated_at = await crud.announcement.version(session, id)
+    if updated_at:
+        unchanged = not_modified(request, response, make_etag("announcement", id, updated_at), updated_at)
+        if unchanged:
+            return unchanged
+
+    async def load():
+        row = await session.get(Announcement, id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Announcement not found")
+        return PrecompressedBody(envelope(serialize(AnnouncementOut, row)))
+
+    body = await response_cache.get_or_load(("announcements", "detail", id), load)
+    return cached_json_response(request, body, response.headers)
 
 
 @router.put("/{id}", response_model=dict)
@@ -36,16 +59,11 @@ async def update_announcement(
     current_user = Depends(require_admin_user),
     session: AsyncSession = Depends(get_session)
 ):
-    row = await session.get(Announcement, id)
+    row = await crud.announcement.update_announcement(session, id, payload.title, payload.body)
     if not row:
         raise HTTPException(status_code=404, detail="Announcement not found")
 
-    row.title = payload.title
-    row.body = payload.body
-    await session.commit()
-    await session.refresh(row)
-
-    return {"success": True, "data": AnnouncementOut.from_orm(row).dict()}
+    return envelope_response(AnnouncementOut, row)
 
 
 @router.delete("/{id}", response_model=dict)
@@ -54,11 +72,8 @@ async def delete_announcement(
     current_user = Depends(require_admin_user),
     session: AsyncSession = Depends(get_session)
 ):
-    row = await session.get(Announcement, id)
-    if not row:
+    ok = await crud.announcement.delete_announcement(session, id)
+    if not ok:
         raise HTTPException(status_code=404, detail="Announcement not found")
 
-    await session.delete(row)
-    await session.commit()
-
     return {"success": True}
@@ -1,18 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 from app.database.session import get_session
 from app.core.deps import require_admin_user, require_user
 from app import crud
-from app.schemas.attendance import AttendanceCreate, AttendanceOut, AttendanceReportRow
-from datetime import date
-from fastapi.responses import StreamingResponse
-import io
-from openpyxl import Workbook
-from reportlab.pdfgen import canvas
+from app.schemas.attendance import AttendanceCreate, AttendanceBulkItem, AttendanceSync, AttendanceOut, AttendanceReportRow, ReportExportRequest, MonthlyAttendanceReport
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from app.core.cache import response_cache
+from app.core.compression import PrecompressedBody
+from app.core.config import settings
+from app.core.responses import cached_json_response, envelope, serialize
+from fastapi.responses import FileResponse, Response, StreamingResponse
+import os
+from app.models.event import Event
+from app.services.attendance_export import (
+    REPORT_HEADER,
+    report_row,
+    report_heading,
+    stream_xlsx,
+    render_attendance_pdf_async,
+    EXPORT_PDF_MAX_ROWS,
+)
+from app.services.report_jobs import report_jobs, ReportQueueFull, DONE
 
 router = APIRouter()
 
+BULK_ATTENDANCE_MAX_ROWS = int(os.getenv("BULK_ATTENDANCE_MAX_ROWS", 1000))
+ATTENDANCE_SYNC_MAX_OPS = int(os.getenv("ATTENDANCE_SYNC_MAX_OPS", 1000))
+MONTHLY_REPORT_MAX_MONTHS = 24
+MONTHLY_REPORT_PAST_TTL = 24 * 60 * 60   # closed months only change through late edits, which invalidate
+
 @router.post("", response_model=AttendanceOut)
 async def mark_attendance(payload: AttendanceCreate, current_user=Depends(require_admin_user), session: AsyncSession = Depends(get_session)):
     """
@@ -34,6 +53,49 @@ async def mark_attendance(payload: AttendanceCreate, current_user=Depends(requir
             raise HTTPException(400, "Attendance already recorded for this participant today")
         raise HTTPException(400, str(e))
 
+@router.post("/events/{event_id}/bulk", response_model=dict)
+async def mark_attendance_bulk(
+    event_id: UUID,
+    rows: List[AttendanceBulkItem],
+    current_user=Depends(require_admin_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Check in many participants of one event in one request.
+    Each row gets a status: recorded, already_recorded or invalid
+    (participant not registered for the event).
+    """
+    if len(rows) > BULK_ATTENDANCE_MAX_ROWS:
+        raise HTTPException(400, f"Maksimal {BULK_ATTENDANCE_MAX_ROWS} baris per permintaan")
+
+    results = await crud.attendance.bulk_create_attendance(session, event_id, rows, current_user.id)
+    return {"success": True, "data": results}
+
+@router.post("/sync", response_model=dict)
+async def sync_attendance(
+    payload: AttendanceSync,
+    current_user=Depends(require_admin_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Replay an offline queue of check-ins and undos in one request.
+    Each op gets applied, duplicate (key already synced) or invalid.
+    Once this returns, every queued op with at <= watermark is settled
+    and can be dropped by the client.
+    """
+    if len(payload.ops) > ATTENDANCE_SYNC_MAX_OPS:
+        raise HTTPException(400, f"Maksimal {ATTENDANCE_SYNC_MAX_OPS} entri per sinkronisasi")
+
+    results = await crud.attendance.sync_attendance(session, payload.ops, current_user.id)
+    watermark = max((op.at for op in payload.ops), default=None)
+    return {
+        "success": True,
+        "data": {
+            "results": results,
+            "watermark": watermark.isoformat() if watermark else None,
+        },
+    }
+
 @router.delete("/{attendance_id}", response_model=dict)
 async def delete_attendance(attendance_id: str, current_user=Depends(require_admin_user), session: AsyncSession = Depends(get_session)):
     ok = await crud.attendance.delete_attendance(session, attendance_id)
@@ -64,60 +126,144 @@ async def attendance_report(
     rows = await crud.attendance.attendance_report(session, event_id, start_date, end_date)
     return rows
 
-@router.get("/export/excel")
-async def export_excel(
-    event_id: str,
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    session: AsyncSession = Depends(get_session)
+@router.get("/reports/monthly", response_model=dict)
+async def monthly_attendance_report(
+    request: Request,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    event_id: Optional[UUID] = Query(None),
+    top: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    current_user = Depends(require_admin_user)
 ):
-    rows = await crud.attendance.attendance_report(session, event_id, start_date, end_date)
+    """
+    Per-month and per-event attendance rates, no-show ratios and top
+    attendees for events held in the months containing start_date to
+    end_date (default: the last six months).
+    """
+    tz_name = settings.CALENDAR_TIMEZONE
+    this_month = datetime.now(ZoneInfo(tz_name)).date().replace(day=1)
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Attendance Report"
+    end_month = (end_date or this_month).replace(day=1)
+    start_month = (start_date or (end_month - timedelta(days=5 * 28))).replace(day=1)
+    months = (end_month.year - start_month.year) * 12 + end_month.month - start_month.month + 1
+    if months < 1 or months > MONTHLY_REPORT_MAX_MONTHS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "INVALID_RANGE",
+                "message": f"Rentang bulan tidak valid (maksimal {MONTHLY_REPORT_MAX_MONTHS} bulan)",
+            },
+        )
+    closed = end_month < this_month
 
-    ws.append(["Participant ID", "Total Hadir"])
+    async def load():
+        report = await crud.attendance.monthly_report(
+            session, start_month, end_month, tz_name, event_id, top
+        )
+        return PrecompressedBody(envelope(serialize(MonthlyAttendanceReport, report), timezone=tz_name))
 
-    for row in rows:
-        ws.append([row["participant_id"], row["attended_count"]])
+    key = ("attendance", "monthly", start_month, end_month, event_id, top, tz_name)
+    body = await response_cache.get_or_load(key, load, ttl=MONTHLY_REPORT_PAST_TTL if closed else None)
 
-    stream = io.BytesIO()
-    wb.save(stream)
-    stream.seek(0)
+    return cached_json_response(request, body, {"Cache-Control": "private, no-cache"})
+
+@router.get("/export/excel")
+async def export_excel(
+    event_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user=Depends(require_admin_user),
+):
+    """
+    Attendance counts per participant as .xlsx, streamed while it is
+    written. Omit event_id to export every event.
+    """
+    query = crud.attendance.attendance_report_query(event_id, start_date, end_date)
 
     return StreamingResponse(
-        stream,
+        stream_xlsx(query, "Attendance Report", REPORT_HEADER, report_row),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": "attachment; filename=attendance.xlsx"}
     )
 
 @router.get("/export/pdf")
 async def export_pdf(
-    event_id: str,
+    event_id: Optional[UUID] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    current_user=Depends(require_admin_user),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await crud.attendance.attendance_report(session, event_id, start_date, end_date)
-
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
-    c.setFont("Helvetica", 12)
-
-    y = 800
-    c.drawString(50, y, f"Attendance Report — Event {event_id}")
-    y -= 40
+    """
+    Attendance counts per participant as a paginated PDF, rendered in
+    the export worker pool. Omit event_id to cover every event. Reports
+    over EXPORT_PDF_MAX_ROWS rows are refused; queue them with
+    POST /attendance/reports/export instead.
+    """
+    event_title = None
+    if event_id:
+        event = await session.get(Event, event_id)
+        if not event:
+            raise HTTPException(404, "Event not found")
+        event_title = event.title
 
-    for row in rows:
-        c.drawString(50, y, f"{row['participant_id']} — {row['attended_count']} hadir")
-        y -= 20
+    query = crud.attendance.attendance_report_query(event_id, start_date, end_date)
+    rows = [tuple(r) for r in (await session.execute(query.limit(EXPORT_PDF_MAX_ROWS + 1))).all()]
+    await session.close()   # release the connection before rendering
+    if len(rows) > EXPORT_PDF_MAX_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "REPORT_TOO_LARGE",
+                "message": f"Laporan melebihi {EXPORT_PDF_MAX_ROWS} baris; gunakan /api/attendance/reports/export",
+            },
+        )
 
-    c.save()
-    buffer.seek(0)
+    title, period = report_heading(event_title, start_date, end_date)
+    pdf = await render_attendance_pdf_async(title, period, rows)
 
-    return StreamingResponse(
-        buffer,
+    return Response(
+        pdf,
         media_type="application/pdf",
         headers={"Content-Disposition": "attachment; filename=attendance.pdf"}
-    )
\ No newline at end of file
+    )
+
+
+# ---------------------------------------------------------
+# Background report jobs
+# ---------------------------------------------------------
+@router.post("/reports/export", response_model=dict, status_code=202)
+async def create_report_export(
+    payload: ReportExportRequest,
+    current_user=Depends(require_admin_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Queue an attendance report file. Identical requests share one job;
+    poll GET /reports/export/{job_id} and download when status is done.
+    """
+    if payload.event_id and not await session.get(Event, payload.event_id):
+        raise HTTPException(404, "Event not found")
+
+    try:
+        job = report_jobs.submit(payload.format, payload.event_id, payload.start_date, payload.end_date)
+    except ReportQueueFull:
+        raise HTTPException(503, "Antrean laporan penuh, coba lagi nanti")
+    return {"success": True, "data": job.to_dict()}
+
+@router.get("/reports/export/{job_id}", response_model=dict)
+async def get_report_export(job_id: str, current_user=Depends(require_admin_user)):
+    job = report_jobs.get(job_id)
+    if not job:
+        raise HTTPException(404, "Report not found or expired")
+    return {"success": True, "data": job.to_dict()}
+
+@router.get("/reports/export/{job_id}/download")
+async def download_report_export(job_id: str, current_user=Depends(require_admin_user)):
+    job = report_jobs.get(job_id)
+    if not job:
+        raise HTTPException(404, "Report not found or expired")
+    if job.status != DONE:
+        raise HTTPException(409, "Report is not ready")
+    return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
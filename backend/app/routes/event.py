@@ -1,13 +1,28 @@
 # app/routes/event.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, NamedTuple, Tuple
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from uuid import UUID
+from functools import lru_cache
 from app.database.session import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.event import EventCreate, EventUpdate, EventOut
+from app.schemas.event import EventCreate, EventUpdate, EventOut, EventSummary, CalendarDay
 from app import crud
 from app.core.deps import require_admin_user, require_user
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.cache import response_cache
+from app.core.conditional import make_etag, not_modified
+from app.core.responses import cached_json_response, envelope, envelope_response, serialize
+from app.core.fieldsets import parse_fields, subset_schema
+from app.core.compression import PrecompressedBody
+from app.core.config import settings
+from app.services.registration_queue import REGISTRATION_BATCHING, registration_queue
+from app.services.participant_import import parse_participant_sheet, stream_participant_import
+from sqlalchemy import select, delete
+from sqlalchemy.orm import load_only, selectinload, with_expression
 
 from app.models.event import Event
 from app.models.participant import Participant
@@ -15,22 +30,60 @@ from app.schemas.participant import ParticipantAdminCreate, ParticipantOut
 
 router = APIRouter()
 
-# Helper: re-query event with relationships loaded
-async def load_event_with_relations(session: AsyncSession, event_id: str) -> Optional[Event]:
-    stmt = (
-        select(Event)
-        .where(Event.id == event_id)
-        .options(
-            selectinload(Event.media),
-            selectinload(Event.participants),
-            selectinload(Event.recurrence),
-            selectinload(Event.roles),
-            selectinload(Event.schedules),
-            selectinload(Event.attendances),
-        )
+# Helper: re-query event with the relationships a response needs
+async def load_event_with_relations(session: AsyncSession, event_id: str, profile: str = "detail") -> Optional[Event]:
+    return await crud.event.get_event(session, event_id, profile)
+
+# Sparse fieldsets: what each EventSummary field costs in SQL.
+# recurrence_pattern is not a column (recurrences are their own
+# resource, see routes.recurrence) and is never filled, so it
+# cannot be requested.
+EVENT_FIELDS = tuple(f for f in EventSummary.model_fields if f != "recurrence_pattern")
+EVENT_COMPUTED_FIELDS = {"slots_remaining"}
+
+class EventProjection(NamedTuple):
+    fields: Tuple[str, ...]       # serialized keys
+    attributes: Tuple[str, ...]   # subset read straight off the ORM object
+    schema: type
+    options: tuple                # loader options for crud.event.list_events
+
+@lru_cache(maxsize=128)
+def event_projection(fields: Optional[Tuple[str, ...]] = None) -> EventProjection:
+    if fields is None:
+        fields = EVENT_FIELDS
+        schema = EventSummary
+        options = crud.event.event_load_options("list")
+    else:
+        schema = subset_schema(EventSummary, fields)
+        columns = [Event.id, Event.event_date]   # keyset pagination needs both
+        options = []
+        for f in fields:
+            if f == "media":
+                options.append(selectinload(Event.media))
+            elif f == "thumbnail_url":
+                options.append(with_expression(Event.thumbnail_url, crud.event.THUMBNAIL_URL))
+            elif f == "slots_remaining":
+                columns += [Event.slots_available, Event.registered_count]
+            elif hasattr(Event, f) and f not in EVENT_COMPUTED_FIELDS:
+                columns.append(getattr(Event, f))
+        options = (load_only(*columns), *options)
+
+    attributes = tuple(
+        f for f in fields if f not in EVENT_COMPUTED_FIELDS and hasattr(Event, f)
     )
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    return EventProjection(fields, attributes, schema, tuple(options))
+
+# Helper: build response rows (counts come from events.registered_count)
+def summarize_events(events, projection: EventProjection = None) -> list:
+    projection = projection or event_projection()
+
+    rows = []
+    for e in events:
+        row = {f: getattr(e, f) for f in projection.attributes}
+        if "slots_remaining" in projection.fields:
+            row["slots_remaining"] = crud.event.slots_remaining(e)
+        rows.append(row)
+    return rows
 
 # CREATE EVENT
 @router.post("", response_model=dict)
@@ -51,7 +104,7 @@ async def create_event(
     )
 
     ev_full = await load_event_with_relations(session, str(ev.id))
-    return {"success": True, "data": EventOut.from_orm(ev_full).dict()}
+    return envelope_response(EventOut, ev_full)
 
 # UPDATE EVENT
 @router.put("/{event_id}", response_model=dict)
@@ -81,7 +134,7 @@ async def edit_event(
 
     # Re-query with relationships eagerly loaded BEFORE serializing
     ev_full = await load_event_with_relations(session, event_id)
-    return {"success": True, "data": EventOut.from_orm(ev_full).dict()}
+    return envelope_response(EventOut, ev_full)
 
 # DELETE EVENT
 @router.delete("/{event_id}", response_model=dict)
@@ -106,43 +159,132 @@ async def delete_event(
             detail={"code": "DELETE_FAILED", "message": "Failed to delete event"},
         )
 
-    return {"success": True, "data": EventOut.from_orm(ev_full).dict()}
+    return envelope_response(EventOut, ev_full)
 
-# LIST EVENTS
+# LIST EVENTS (keyset paginated; q= runs a ranked full-text search)
 @router.get("", response_model=dict)
 async def list_events(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(None),
     upcoming: Optional[bool] = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated EventSummary fields"),
     session: AsyncSession = Depends(get_session)
 ):
-    stmt = (
-        select(Event)
-        .options(
-            selectinload(Event.media),
-            selectinload(Event.participants)
+    try:
+        after = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_CURSOR", "message": "Cursor tidak valid"},
         )
-        .order_by(Event.event_date.asc())
-    )
 
-    events = (await session.execute(stmt)).scalars().all()
+    try:
+        field_set = parse_fields(fields, EVENT_FIELDS)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_FIELDS", "message": str(exc)},
+        )
+    projection = event_projection(field_set)
+
+    key = ("events", "list", q, bool(upcoming), limit, cursor, field_set)
+
+    # The ETag is stored with the cached body, so a cache hit costs no
+    # query. On a miss the validator is read first and a matching
+    # If-None-Match is answered before the list query runs.
+    etag = None
+    if response_cache.get(key) is None:
+        etag = make_etag(*key, *await crud.event.list_version(session))
+        unchanged = not_modified(request, response, etag)
+        if unchanged:
+            return unchanged
+
+    async def load():
+        validator = etag or make_etag(*key, *await crud.event.list_version(session))
+        events, last_key = await crud.event.list_events(
+            session, q=q, upcoming=upcoming, limit=limit, after=after,
+            options=projection.options,
+        )
+        rows = summarize_events(events, projection)
+        body = envelope(
+            serialize(projection.schema, rows, many=True),
+            next_cursor=encode_cursor(*last_key) if last_key else None,
+        )
+        return PrecompressedBody(body, etag=validator)
 
-    return {
-        "success": True,
-        "data": [EventOut.from_orm(e).dict() for e in events]
-    }
+    body = await response_cache.get_or_load(key, load)
 
-# GET EVENT BY ID
-@router.get("/{event_id}", response_model=dict)
-async def get_event(event_id: str, session: AsyncSession = Depends(get_session)):
-    ev = await load_event_with_relations(session, event_id)
+    unchanged = not_modified(request, response, body.etag)
+    if unchanged:
+        return unchanged
+    return cached_json_response(request, body, response.headers)
 
-    if not ev:
+# CALENDAR (per-day buckets for a month/week view)
+CALENDAR_MAX_DAYS = 62
+CALENDAR_PAST_TTL = 24 * 60 * 60   # closed ranges only change through admin edits
+
+@router.get("/calendar", response_model=dict)
+async def event_calendar(
+    request: Request,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    session: AsyncSession = Depends(get_session)
+):
+    if date_to < date_from or (date_to - date_from).days >= CALENDAR_MAX_DAYS:
         raise HTTPException(
-            status_code=404,
-            detail={"code": "EVENT_NOT_FOUND", "message": "Event tidak ditemukan"},
+            status_code=400,
+            detail={
+                "code": "INVALID_RANGE",
+                "message": f"Rentang tanggal tidak valid (maksimal {CALENDAR_MAX_DAYS} hari)",
+            },
         )
 
-    return {"success": True, "data": EventOut.from_orm(ev).dict()}
+    tz_name = settings.CALENDAR_TIMEZONE
+    today = datetime.now(ZoneInfo(tz_name)).date()
+    closed = date_to < today.replace(day=1)   # ends before the current month
+
+    async def load():
+        days = await crud.event.calendar_days(session, date_from, date_to, tz_name)
+        return PrecompressedBody(envelope(serialize(CalendarDay, days, many=True), timezone=tz_name))
+
+    key = ("events", "calendar", date_from, date_to, tz_name)
+    body = await response_cache.get_or_load(key, load, ttl=CALENDAR_PAST_TTL if closed else None)
+
+    headers = {"Cache-Control": "public, max-age=3600" if closed else "no-cache"}
+    return cached_json_response(request, body, headers)
+
+# GET EVENT BY ID
+@router.get("/{event_id}", response_model=dict)
+async def get_event(
+    event_id: str,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
+    version = await crud.event.version(session, event_id)
+    if version:
+        etag = make_etag("event", event_id, *version)
+        unchanged = not_modified(request, response, etag)
+        if unchanged:
+            return unchanged
+
+    async def load():
+        ev = await load_event_with_relations(session, event_id)
+
+        if not ev:
+            raise HTTPException(
+                status_code=404,
+                detail={"code": "EVENT_NOT_FOUND", "message": "Event tidak ditemukan"},
+            )
+
+        rows = summarize_events([ev])
+        return PrecompressedBody(envelope(serialize(EventSummary, rows[0])))
+
+    body = await response_cache.get_or_load(("events", "detail", event_id), load)
+    return cached_json_response(request, body, response.headers)
 
 # REGISTER FOR EVENT
 @router.post("/{event_id}/register", response_model=dict)
@@ -151,44 +293,28 @@ async def register_for_event(
     current_user=Depends(require_user),
     session: AsyncSession = Depends(get_session)
 ):
-    # Load event with participants count and media (safe)
-    event = await load_event_with_relations(session, event_id)
-
-    if not event:
+    try:
+        event_uuid = UUID(event_id)
+    except ValueError:
         raise HTTPException(404, "Event not found")
 
-    if not event.requires_registration:
-        raise HTTPException(400, "Event does not require registration")
+    if REGISTRATION_BATCHING:
+        # The queue uses its own connections; hand back the one that
+        # resolved current_user instead of holding it while we wait.
+        user_id = current_user.id
+        await session.close()
+        outcome, remaining = await registration_queue.submit(event_uuid, user_id)
+    else:
+        outcome, remaining = await crud.event.register_participant(session, event_uuid, current_user.id)
 
-    # Already registered?
-    q = await session.execute(
-        select(Participant).where(
-            Participant.event_id == event_id,
-            Participant.user_id == current_user.id,
-        )
-    )
-    existing = q.scalars().first()
-
-    if existing:
+    if outcome == crud.event.NOT_FOUND:
+        raise HTTPException(404, "Event not found")
+    if outcome == crud.event.CLOSED:
+        raise HTTPException(400, "Event does not require registration")
+    if outcome == crud.event.DUPLICATE:
         raise HTTPException(400, "You already registered")
-
-    # Slot limit
-    if event.slots_available is not None:
-        if len(event.participants) >= event.slots_available:
-            raise HTTPException(400, "Event is full")
-
-    # Register
-    p = Participant(event_id=event_id, user_id=current_user.id)
-    session.add(p)
-    await session.commit()
-    await session.refresh(p)
-
-    # Re-load event to get updated participants safely if needed
-    event = await load_event_with_relations(session, event_id)
-    remaining = (
-        event.slots_available - len(event.participants)
-        if event.slots_available is not None else None
-    )
+    if outcome == crud.event.FULL:
+        raise HTTPException(400, "Event is full")
 
     return {
         "success": True,
@@ -244,6 +370,41 @@ async def register_participant_by_admin(
     
     return await crud.participation.create_participant(session, participant_data)
 
+# ADMIN – bulk register participants from a CSV/XLSX sheet
+@router.post("/{event_id}/participants/import")
+async def import_participants(
+    event_id: str,
+    file: UploadFile = File(...),
+    current_user = Depends(require_admin_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Columns: nama, email, telepon (one of email/telepon per row).
+    Streams one NDJSON result per row, then a summary line.
+    """
+    event = await load_event_with_relations(session, event_id, "minimal")
+    if not event:
+        raise HTTPException(404, "Event not found")
+
+    content = await file.read()
+    try:
+        rows = await run_in_threadpool(parse_participant_sheet, file.filename, content)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_FILE", "message": str(exc)},
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_FILE", "message": "File tidak dapat dibaca (gunakan CSV atau XLSX)"},
+        )
+
+    return StreamingResponse(
+        stream_participant_import(event.id, rows),
+        media_type="application/x-ndjson",
+    )
+
 # UNREGISTER (USER)
 @router.delete("/{event_id}/unregister", response_model=dict)
 async def unregister_from_event(
@@ -251,27 +412,29 @@ async def unregister_from_event(
     current_user = Depends(require_user),
     session: AsyncSession = Depends(get_session)
 ):
-    event = await load_event_with_relations(session, event_id)
+    event = await load_event_with_relations(session, event_id, "minimal")
 
     if not event:
         raise HTTPException(404, "Event not found")
 
-    q = await session.execute(
-        select(Participant).where(
+    removed = await session.execute(
+        delete(Participant)
+        .where(
             Participant.event_id == event_id,
             Participant.user_id == current_user.id
         )
+        .returning(Participant.id)
     )
-    p = q.scalars().first()
 
-    if not p:
+    if not removed.first():
         return {
             "success": True,
             "message": "You were not registered for this event."
         }
 
-    await session.delete(p)
+    await crud.event.adjust_registered_count(session, event_id, -1)
     await session.commit()
+    response_cache.invalidate("events", "roles")
 
     return {
         "success": True,
@@ -286,18 +449,20 @@ async def remove_participant(
     current_user=Depends(require_admin_user),
     session: AsyncSession = Depends(get_session)
 ):
-    q = await session.execute(
-        select(Participant).where(
+    removed = await session.execute(
+        delete(Participant)
+        .where(
             Participant.event_id == event_id,
             Participant.user_id == user_id,
         )
+        .returning(Participant.id)
     )
-    p = q.scalars().first()
 
-    if not p:
+    if not removed.first():
         raise HTTPException(404, "Participant not found")
 
-    await session.delete(p)
+    await crud.event.adjust_registered_count(session, event_id, -1)
     await session.commit()
+    response_cache.invalidate("events", "roles")
 
     return {"success": True}
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.session import get_session
-from app.schemas.participant import ParticipantCreate, ParticipantOut
+from app.schemas.participant import ParticipantCreate, ParticipantOut, RoleAssignmentBulk
 from app.core.deps import require_admin_user
 from app.models.participant import Participant
 from app import crud
@@ -66,6 +66,22 @@ async def list_participants(event_id: str, session: AsyncSession = Depends(get_s
     ]
 
 
+@router.put("/assign-roles", response_model=List[ParticipantOut])
+async def assign_roles_bulk(
+    payload: RoleAssignmentBulk,
+    current_user = Depends(require_admin_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Staff a whole event at once: {"assignments": {participant_id: role_id}}.
+    All-or-nothing; returns the participants of the affected events.
+    """
+    if not payload.assignments:
+        return []
+
+    event_ids = await crud.role.assign_many(session, payload.assignments)
+    return await crud.participation.list_participants_for_events(session, event_ids)
+
 @router.put("/{participant_id}/assign-role/{role_id}", response_model=ParticipantOut)
 async def assign_role(
     participant_id: str,
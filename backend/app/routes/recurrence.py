@@ -7,6 +7,7 @@ from app.schemas.recurrence import RecurrenceCreate, RecurrenceUpdate, Recurrenc
 from app.crud import recurrence as crud
 from app.database.session import get_session
 from app.core.deps import require_admin_user
+from app.core.responses import envelope_response
 
 
 router = APIRouter()
@@ -22,7 +23,7 @@ async def create_recurrence(
     session: AsyncSession = Depends(get_session)
 ):
     rec = await crud.create_recurrence(session, payload.model_dump())
-    return {"success": True, "data": RecurrenceOut.from_orm(rec)}
+    return envelope_response(RecurrenceOut, rec)
 
 
 # ------------------------------------------------------
@@ -36,7 +37,7 @@ async def get_recurrence(
     rec = await crud.get(session, id)
     if not rec:
         raise HTTPException(404, "Recurrence not found")
-    return {"success": True, "data": RecurrenceOut.from_orm(rec)}
+    return envelope_response(RecurrenceOut, rec)
 
 
 # ------------------------------------------------------
@@ -60,13 +61,11 @@ async def list_recurrences(
         if not isinstance(recs, (list, tuple)):
             recs = [recs]
 
-        data = [RecurrenceOut.model_validate(r) for r in recs]
-        return {"success": True, "data": data}
+        return envelope_response(RecurrenceOut, recs, many=True)
 
     # Otherwise return ALL recurrences
     rows = await crud.list_recurrences(session)
-    data = [RecurrenceOut.model_validate(r) for r in rows]
-    return {"success": True, "data": data}
+    return envelope_response(RecurrenceOut, rows, many=True)
 
 
 # ------------------------------------------------------
@@ -85,7 +84,7 @@ async def update_recurrence(
     if not rec:
         raise HTTPException(404, "Recurrence not found")
 
-    return {"success": True, "data": RecurrenceOut.from_orm(rec)}
+    return envelope_response(RecurrenceOut, rec)
 
 
 # ------------------------------------------------------
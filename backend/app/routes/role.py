@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from uuid import UUID
 
 from app.database.session import get_session
-from app.schemas.role import RoleCreate, RoleOut
+from app.schemas.role import RoleCreate, RoleOut, RoleSummary
 from app.core.deps import require_admin_user
 from app import crud
+from app.core.cache import response_cache
+from app.core.conditional import make_etag, not_modified
+from app.core.compression import PrecompressedBody
+from app.core.responses import cached_json_response, serialize
 
 router = APIRouter()
 
@@ -28,17 +32,28 @@ async def create_role(
 # --------------------------------------------------
 # LIST ROLES (optionally filtered by event)
 # --------------------------------------------------
-@router.get("", response_model=List[RoleOut])
+@router.get("", response_model=List[RoleSummary])
 async def list_roles(
+    request: Request,
+    response: Response,
     event_id: Optional[UUID] = Query(None),
     session: AsyncSession = Depends(get_session)
 ):
-    if event_id:
-        rows = await crud.role.list_roles(session, event_id)
-    else:
-        rows = await crud.role.list_all_roles(session)
+    version = await crud.role.collection_version(session, event_id)
+    unchanged = not_modified(request, response, make_etag("roles", event_id, *version))
+    if unchanged:
+        return unchanged
 
-    return [RoleOut.from_orm(r) for r in rows]
+    async def load():
+        if event_id:
+            rows = await crud.role.list_roles(session, event_id)
+        else:
+            rows = await crud.role.list_all_roles(session)
+
+        return PrecompressedBody(serialize(RoleSummary, rows, many=True))
+
+    body = await response_cache.get_or_load(("roles", "list", event_id), load)
+    return cached_json_response(request, body, response.headers)
 
 
 # --------------------------------------------------
@@ -47,14 +62,26 @@ async def list_roles(
 @router.get("/{role_id}", response_model=RoleOut)
 async def get_role(
     role_id: UUID,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
-    role = await crud.role.get_role(session, role_id)
+    updated_at = await crud.role.version(session, role_id)
+    if updated_at:
+        unchanged = not_modified(request, response, make_etag("role", role_id, updated_at), updated_at)
+        if unchanged:
+            return unchanged
 
-    if not role:
-        raise HTTPException(404, "Role not found")
+    async def load():
+        role = await crud.role.get_role(session, role_id)
 
-    return RoleOut.from_orm(role)
+        if not role:
+            raise HTTPException(404, "Role not found")
+
+        return PrecompressedBody(serialize(RoleOut, role))
+
+    body = await response_cache.get_or_load(("roles", "detail", role_id), load)
+    return cached_json_response(request, body, response.headers)
 
 
 # --------------------------------------------------
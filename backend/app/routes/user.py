@@ -1,44 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.session import get_session
 from app.core.deps import require_admin_user, get_current_user
 from app.schemas.auth import UserOut, UserUpdate
 from app.models.user import User
 from sqlalchemy import select
+from sqlalchemy.orm import load_only
+from functools import lru_cache
+from typing import Optional, Tuple
 from app.core.security import get_password_hash
+from app.core.cache import response_cache
+from app.core.conditional import make_etag, not_modified
+from app.core.responses import JSONBytesResponse, envelope, envelope_response, serialize
+from app.core.fieldsets import parse_fields, subset_schema
+from app.crud import user as user_crud
+from app.crud import event as event_crud
 
 router = APIRouter()
 
+USER_FIELDS = tuple(UserOut.model_fields)
+
+
+# Sparse fieldsets: (schema, loader options) cached per normalized field set
+@lru_cache(maxsize=64)
+def user_projection(fields: Optional[Tuple[str, ...]] = None):
+    if fields is None:
+        return UserOut, ()
+    columns = {getattr(User, f) for f in fields} | {User.id}
+    return subset_schema(UserOut, fields), (load_only(*columns),)
+
 
 @router.get("", response_model=dict)
 async def list_users(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
     current_user = Depends(require_admin_user)
 ):
-    stmt = select(User).order_by(User.created_at.desc())
+    try:
+        field_set = parse_fields(fields, USER_FIELDS)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_FIELDS", "message": str(exc)},
+        )
+    schema, options = user_projection(field_set)
+
+    version = await user_crud.collection_version(session)
+    unchanged = not_modified(request, response, make_etag("users", field_set, *version))
+    if unchanged:
+        return unchanged
+
+    stmt = select(User).options(*options).order_by(User.created_at.desc())
     result = await session.execute(stmt)
     users = result.scalars().all()
 
-    return {
-        "success": True,
-        "data": [UserOut.from_orm(u).dict() for u in users]
-    }
+    return JSONBytesResponse(
+        envelope(serialize(schema, users, many=True)),
+        headers=response.headers,
+    )
 
 
 @router.get("/{user_id}", response_model=dict)
 async def get_user(
     user_id: str,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user = Depends(require_admin_user)
 ):
+    updated_at = await user_crud.version(session, user_id)
+    if updated_at:
+        unchanged = not_modified(request, response, make_etag("user", user_id, updated_at), updated_at)
+        if unchanged:
+            return unchanged
+
     user = await session.get(User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
 
-    return {
-        "success": True,
-        "data": UserOut.from_orm(user).dict()
-    }
+    return JSONBytesResponse(
+        envelope(serialize(UserOut, user)),
+        headers=response.headers,
+    )
 
 
 @router.delete("/{user_id}", response_model=dict)
@@ -51,8 +96,10 @@ async def delete_user(
     if not user:
         raise HTTPException(404, "User not found")
 
+    await event_crud.release_user_registrations(session, user.id)
     await session.delete(user)
     await session.commit()
+    response_cache.invalidate("events", "roles")   # their registrations are gone
 
     return {"success": True}
 
@@ -81,7 +128,7 @@ async def update_own_account(
     await session.commit()
     await session.refresh(user)
 
-    return {"success": True, "data": UserOut.from_orm(user).dict()}
+    return envelope_response(UserOut, user)
 
 
 # admin edits another user's account
@@ -111,4 +158,4 @@ async def admin_update_user(
     await session.commit()
     await session.refresh(user)
 
-    return {"success": True, "data": UserOut.from_orm(user).dict()}
\ No newline at end of file
+    return envelope_response(UserOut, user)
\ No newline at end of file
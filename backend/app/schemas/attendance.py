@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 from datetime import datetime, date
 
@@ -9,6 +9,22 @@ class AttendanceCreate(BaseModel):
     attended_at: Optional[datetime] = None
     notes: Optional[str] = None
 
+class AttendanceBulkItem(BaseModel):
+    participant_id: UUID
+    attended_at: Optional[datetime] = None
+    notes: Optional[str] = None
+
+class AttendanceSyncOp(BaseModel):
+    key: UUID                          # client-generated idempotency key
+    action: Literal["check_in", "undo"]
+    event_id: UUID
+    participant_id: UUID
+    at: datetime                       # when it happened on the device
+    notes: Optional[str] = None
+
+class AttendanceSync(BaseModel):
+    ops: List[AttendanceSyncOp]
+
 class AttendanceOut(BaseModel):
     id: UUID
     event_id: UUID
@@ -22,4 +38,47 @@ class AttendanceOut(BaseModel):
 
 class AttendanceReportRow(BaseModel):
     participant_id: UUID
-    attended_count: int
\ No newline at end of file
+    attended_count: int
+
+class ReportExportRequest(BaseModel):
+    format: Literal["xlsx", "pdf", "csv"] = "xlsx"
+    event_id: Optional[UUID] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+class EventAttendanceStat(BaseModel):
+    event_id: UUID
+    title: str
+    event_date: datetime
+    registered: int
+    attendees: int
+    check_ins: int
+    attendance_rate: Optional[float]
+    no_show_ratio: Optional[float]
+
+class AttendanceTotals(BaseModel):
+    events: int
+    registered: int
+    attendees: int
+    check_ins: int
+    attendance_rate: Optional[float]
+    no_show_ratio: Optional[float]
+
+class MonthlyAttendanceStat(AttendanceTotals):
+    month: str                  # YYYY-MM, local to the calendar timezone
+    per_event: List[EventAttendanceStat]
+
+class TopAttendee(BaseModel):
+    user_id: UUID
+    full_name: Optional[str]
+    check_ins: int
+    events_attended: int
+    rank: int
+
+class MonthlyAttendanceReport(BaseModel):
+    start_month: str
+    end_month: str
+    totals: AttendanceTotals
+    months: List[MonthlyAttendanceStat]
+    top_attendees: List[TopAttendee]
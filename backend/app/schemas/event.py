@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, date
 from uuid import UUID
 from app.schemas.participant import ParticipantOut
 
@@ -45,3 +45,21 @@ class EventOut(BaseModel):
     media: Optional[list[EventMediaOut]] = None
 
     model_config = {"from_attributes": True}
+
+class EventSummary(EventOut):
+    # Aggregated in SQL, participant rows are never loaded
+    registered_count: int = 0
+    slots_remaining: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+
+class CalendarEvent(BaseModel):
+    id: UUID
+    title: str
+    location: Optional[str] = None
+    event_date: datetime
+    is_cancelled: Optional[bool] = None
+
+class CalendarDay(BaseModel):
+    date: date
+    count: int
+    events: list[CalendarEvent]
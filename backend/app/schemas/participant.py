@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 class ParticipantCreate(BaseModel):
     event_id: UUID
@@ -13,6 +13,10 @@ class ParticipantAdminCreate(BaseModel):
     email: Optional[str] = None
     phone: Optional[str] = None
 
+class RoleAssignmentBulk(BaseModel):
+    # participant_id -> role_id (null removes the participant's role)
+    assignments: Dict[UUID, Optional[UUID]]
+
 class ParticipantOut(BaseModel):
     id: UUID
     event_id: UUID
@@ -17,4 +17,7 @@ class RoleOut(RoleBase):
     created_at: datetime
     updated_at: datetime
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+class RoleSummary(RoleOut):
+    slots_filled: int = 0
\ No newline at end of file
@@ -0,0 +1,243 @@
+import io
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from app.database.session import AsyncSessionLocal
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_FETCH_ROWS = int(os.getenv("EXPORT_FETCH_ROWS", 1000))
+# Batches / output chunks allowed in flight between the loop and the writer
+EXPORT_QUEUE_DEPTH = int(os.getenv("EXPORT_QUEUE_DEPTH", 4))
+EXPORT_CHUNK_BYTES = 64 * 1024
+# PDFs rendered at once; further requests wait for a free worker
+EXPORT_PDF_WORKERS = int(os.getenv("EXPORT_PDF_WORKERS", 2))
+# Rows a synchronous PDF export may hold in memory; larger reports
+# go through the background job queue (POST /attendance/reports/export)
+EXPORT_PDF_MAX_ROWS = int(os.getenv("EXPORT_PDF_MAX_ROWS", 5000))
+
+_pdf_pool = ThreadPoolExecutor(max_workers=EXPORT_PDF_WORKERS, thread_name_prefix="pdf-export")
+
+# Columns of attendance_report_query rows in xlsx / csv exports
+REPORT_HEADER = ["Participant ID", "Nama", "Total Hadir"]
+
+
+def report_row(r) -> list:
+    return [str(r.participant_id), r.participant_name, r.attended_count]
+
+
+def report_heading(event_title: Optional[str], start_date, end_date) -> Tuple[str, str]:
+    """(title, period line) shown on top of a report."""
+    title = "Laporan Kehadiran"
+    if event_title:
+        title = f"{title} - {event_title}"
+    return title, f"Periode: {start_date or 'awal'} s/d {end_date or 'sekarang'}"
+
+
+class _Aborted(Exception):
+    """The client went away; stop writing."""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable file object handing everything written to `emit`."""
+
+    def __init__(self, emit: Callable[[bytes], None]):
+        self._emit = emit
+        self._failed = False
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if not self._failed:   # zipfile flushes again from __del__ after an abort
+            try:
+                self._emit(bytes(b))
+            except Exception:
+                self._failed = True
+                raise
+        return len(b)
+
+
+# ---------------------------------------------------------
+# Worker thread
+# ---------------------------------------------------------
+def _write_workbook(title: str, header: list, next_batch, emit):
+    # write_only sheets spool their rows to a temp file as they are
+    # appended, so memory does not grow with the report.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(header)
+
+    while (batch := next_batch()) is not None:
+        for row in batch:
+            ws.append(row)
+
+    # zipfile writes data descriptors when the target cannot seek, so the
+    # archive goes out chunk by chunk while it is being compressed.
+    sink = io.BufferedWriter(_ChunkSink(emit), buffer_size=EXPORT_CHUNK_BYTES)
+    wb.save(sink)
+    sink.flush()
+
+
+# ---------------------------------------------------------
+# Streaming export
+# ---------------------------------------------------------
+async def stream_xlsx(query, title: str, header: List[str], to_row: Callable) -> AsyncIterator[bytes]:
+    """
+    Stream the rows of `query` as an .xlsx file.
+
+    The event loop reads the query through a server-side cursor, a
+    worker thread builds the workbook, and bounded queues between them
+    keep at most EXPORT_QUEUE_DEPTH batches and chunks in memory.
+    """
+    loop = asyncio.get_running_loop()
+    batches = asyncio.Queue(maxsize=EXPORT_QUEUE_DEPTH)
+    chunks = asyncio.Queue(maxsize=EXPORT_QUEUE_DEPTH)
+    closed = threading.Event()
+
+    def next_batch():
+        batch = asyncio.run_coroutine_threadsafe(batches.get(), loop).result()
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    def emit(chunk):
+        if closed.is_set():
+            raise _Aborted()
+        asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop).result()
+
+    async def read_rows():
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.stream(query.execution_options(yield_per=EXPORT_FETCH_ROWS))
+                async for part in result.partitions():
+                    await batches.put([to_row(r) for r in part])
+            await batches.put(None)
+        except Exception as exc:
+            await batches.put(exc)   # fail the workbook rather than truncate it
+
+    async def write_book():
+        try:
+            await asyncio.to_thread(_write_workbook, title, header, next_batch, emit)
+        finally:
+            await chunks.put(None)
+
+    reader = asyncio.create_task(read_rows())
+    writer = asyncio.create_task(write_book())
+    try:
+        while (chunk := await chunks.get()) is not None:
+            yield chunk
+        await writer   # surface a failure in the worker
+    finally:
+        closed.set()
+        reader.cancel()
+        # Unblock the worker wherever it waits so the thread can exit
+        while not writer.done():
+            while not chunks.empty():
+                chunks.get_nowait()
+            if batches.empty():
+                batches.put_nowait(None)
+            await asyncio.sleep(0.01)
+        await asyncio.gather(reader, writer, return_exceptions=True)
+
+
+# ---------------------------------------------------------
+# PDF
+# ---------------------------------------------------------
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 40
+ROW_HEIGHT = 16
+FONT, FONT_BOLD, FONT_SIZE = "Helvetica", "Helvetica-Bold", 9
+
+# (header, x offset, width)
+PDF_COLUMNS = [
+    ("No", 0, 36),
+    ("Nama", 36, 210),
+    ("Participant ID", 246, 210),
+    ("Hadir", 456, 59),
+]
+
+
+def _fit(text: str, width: float, font: str = FONT) -> str:
+    """Cut `text` with an ellipsis so it fits in `width` points."""
+    text = text or "-"
+    if stringWidth(text, font, FONT_SIZE) <= width:
+        return text
+    while text and stringWidth(text + "...", font, FONT_SIZE) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def render_attendance_pdf(title: str, subtitle: str, rows: Sequence[tuple]) -> bytes:
+    """
+    Paginated A4 report of (participant_id, participant_name,
+    attended_count) rows with a repeated header, page numbers and
+    totals. Pure CPU work; run it in the export pool.
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+    c.setTitle(title)
+    generated = datetime.now().strftime("%d-%m-%Y %H:%M")
+    page = 0
+
+    def start_page():
+        nonlocal page
+        page += 1
+        y = PAGE_HEIGHT - MARGIN
+        c.setFont(FONT_BOLD, 13)
+        c.drawString(MARGIN, y, _fit(title, PAGE_WIDTH - 2 * MARGIN, FONT_BOLD))
+        y -= 16
+        c.setFont(FONT, FONT_SIZE)
+        c.drawString(MARGIN, y, subtitle)
+        c.drawRightString(PAGE_WIDTH - MARGIN, y, f"Dicetak {generated}")
+        y -= 22
+
+        c.setFont(FONT_BOLD, FONT_SIZE)
+        for header, x, width in PDF_COLUMNS:
+            if header == "Hadir":
+                c.drawRightString(MARGIN + x + width, y, header)
+            else:
+                c.drawString(MARGIN + x, y, header)
+        c.line(MARGIN, y - 4, PAGE_WIDTH - MARGIN, y - 4)
+
+        c.setFont(FONT, FONT_SIZE)
+        c.drawCentredString(PAGE_WIDTH / 2, MARGIN / 2, f"Halaman {page}")
+        return y - ROW_HEIGHT
+
+    y = start_page()
+    total = 0
+    for number, (participant_id, name, count) in enumerate(rows, start=1):
+        if y < MARGIN + ROW_HEIGHT:
+            c.showPage()
+            y = start_page()
+        c.drawString(MARGIN, y, str(number))
+        c.drawString(MARGIN + PDF_COLUMNS[1][1], y, _fit(name, PDF_COLUMNS[1][2] - 8))
+        c.drawString(MARGIN + PDF_COLUMNS[2][1], y, str(participant_id))
+        c.drawRightString(PAGE_WIDTH - MARGIN, y, str(count))
+        total += count
+        y -= ROW_HEIGHT
+
+    if y < MARGIN + 2 * ROW_HEIGHT:
+        c.showPage()
+        y = start_page()
+    c.line(MARGIN, y + ROW_HEIGHT - 4, PAGE_WIDTH - MARGIN, y + ROW_HEIGHT - 4)
+    c.setFont(FONT_BOLD, FONT_SIZE)
+    c.drawString(MARGIN, y - 2, f"Total: {len(rows)} peserta")
+    c.drawRightString(PAGE_WIDTH - MARGIN, y - 2, f"{total} kehadiran")
+
+    c.save()
+    return buffer.getvalue()
+
+
+async def render_attendance_pdf_async(title: str, subtitle: str, rows: Sequence[tuple]) -> bytes:
+    """render_attendance_pdf in the bounded export pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pdf_pool, render_attendance_pdf, title, subtitle, rows)
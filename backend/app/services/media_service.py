@@ -5,6 +5,7 @@ from PIL import Image, UnidentifiedImageError
 from supabase import create_client, Client
 from app.models.event_media import EventMedia
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import response_cache
 
 # config via env (adjust in your .env)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -62,6 +63,7 @@ async def upload_media(session: AsyncSession, file, event_id: str):
     session.add(media)
     await session.commit()
     await session.refresh(media)
+    response_cache.invalidate("events")
 
     return media
 
@@ -87,4 +89,5 @@ async def delete_media(session: AsyncSession, media_id: str):
 
     await session.delete(media)
     await session.commit()
+    response_cache.invalidate("events")
     return True
\ No newline at end of file
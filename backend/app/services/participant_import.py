@@ -0,0 +1,217 @@
+import io
+import os
+import csv
+import json
+import logging
+from typing import AsyncIterator, List, NamedTuple, Optional
+
+from openpyxl import load_workbook
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import AsyncSessionLocal
+from app.models.participant import Participant
+from app.crud import event as event_crud
+from app.crud import user as user_crud
+from app.core.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", 5000))
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", 500))
+
+# Accepted spellings of each column header (compared lowercased and trimmed)
+HEADER_ALIASES = {
+    "full_name": {"full_name", "full name", "name", "nama", "nama lengkap"},
+    "email": {"email", "e-mail"},
+    "phone": {"phone", "telepon", "no. telepon", "no telepon", "no_hp", "no. hp", "hp", "nomor hp"},
+}
+
+
+class ImportRow(NamedTuple):
+    row: int                 # line in the sheet, header is row 1
+    full_name: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+
+
+# ---------------------------------------------------------
+# Parsing (CPU-bound, run in a worker thread)
+# ---------------------------------------------------------
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)   # phone numbers typed as numbers in Excel
+    value = str(value).strip()
+    return value or None
+
+
+def _column_map(header) -> dict:
+    columns = {}
+    for index, title in enumerate(header):
+        title = (_clean(title) or "").lower()
+        for field, aliases in HEADER_ALIASES.items():
+            if title in aliases and field not in columns:
+                columns[field] = index
+
+    if "full_name" not in columns or not ({"email", "phone"} & set(columns)):
+        raise ValueError("Kolom wajib: nama dan email atau telepon")
+    return columns
+
+
+def _iter_table(filename: str, content: bytes):
+    if (filename or "").lower().endswith(".xlsx"):
+        wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        try:
+            yield from wb.active.iter_rows(values_only=True)
+        finally:
+            wb.close()
+    else:
+        try:
+            text = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError("File CSV harus berformat UTF-8")
+        yield from csv.reader(io.StringIO(text))
+
+
+def parse_participant_sheet(filename: str, content: bytes) -> List[ImportRow]:
+    """Read a CSV or XLSX of names, emails and phones. Raises ValueError."""
+    table = _iter_table(filename, content)
+    header = next(table, None)
+    if header is None:
+        raise ValueError("File kosong")
+    columns = _column_map(header)
+
+    def cell(values, field):
+        index = columns.get(field)
+        return _clean(values[index]) if index is not None and index < len(values) else None
+
+    rows = []
+    for number, values in enumerate(table, start=2):
+        if not any(_clean(v) for v in values):
+            continue
+        if len(rows) >= IMPORT_MAX_ROWS:
+            raise ValueError(f"Maksimal {IMPORT_MAX_ROWS} baris per file")
+        rows.append(ImportRow(number, cell(values, "full_name"), cell(values, "email"), cell(values, "phone")))
+    return rows
+
+
+# ---------------------------------------------------------
+# Import
+# ---------------------------------------------------------
+async def _import_chunk(session: AsyncSession, event_id, rows: List[ImportRow]) -> list:
+    results = {}
+    valid = []
+    for r in rows:
+        if not r.full_name:
+            results[r.row] = {"row": r.row, "status": "invalid", "message": "Nama wajib diisi"}
+        elif not r.email and not r.phone:
+            results[r.row] = {"row": r.row, "status": "invalid", "message": "Email atau No. Telepon wajib diisi"}
+        else:
+            valid.append(r)
+
+    # Existing users: one IN query, email wins over phone (as in register-admin)
+    by_email, by_phone = {}, {}
+    found = await user_crud.find_by_emails_or_phones(
+        session,
+        {r.email for r in valid if r.email},
+        {r.phone for r in valid if r.phone},
+    )
+    for user_id, email, phone in found:
+        if email:
+            by_email[email] = user_id
+        if phone:
+            by_phone[phone] = user_id
+
+    def resolve(r):
+        return (r.email and by_email.get(r.email)) or (r.phone and by_phone.get(r.phone))
+
+    # Missing users: one insert, one shared password hash
+    new_users = {}
+    for r in valid:
+        if not resolve(r):
+            key = r.email or r.phone
+            new_users.setdefault(key, {
+                "full_name": r.full_name,
+                "email": r.email,
+                "phone": None if r.email else r.phone,
+            })
+    created = await user_crud.bulk_create_users(session, list(new_users.values()))
+    created_ids = set()
+    for user_id, email, phone in created:
+        created_ids.add(user_id)
+        if email:
+            by_email[email] = user_id
+        if phone:
+            by_phone[phone] = user_id
+
+    # Taken by a concurrent insert between the lookup and ours
+    unresolved = [r for r in valid if not resolve(r)]
+    if unresolved:
+        found = await user_crud.find_by_emails_or_phones(
+            session,
+            {r.email for r in unresolved if r.email},
+            {r.phone for r in unresolved if r.phone},
+        )
+        for user_id, email, phone in found:
+            if email:
+                by_email.setdefault(email, user_id)
+            if phone:
+                by_phone.setdefault(phone, user_id)
+
+    # Participants: one insert, duplicates skipped by uq_participants_event_user
+    user_ids = list(dict.fromkeys(resolve(r) for r in valid if resolve(r)))
+    inserted = set()
+    if user_ids:
+        q = await session.execute(
+            event_crud.insert_participants()
+            .values([{"event_id": event_id, "user_id": u} for u in user_ids])
+            .returning(Participant.user_id)
+        )
+        inserted = set(q.scalars().all())
+        await event_crud.adjust_registered_count(session, event_id, len(inserted))
+    await session.commit()
+
+    for r in valid:
+        user_id = resolve(r)
+        if user_id is None:
+            results[r.row] = {"row": r.row, "status": "error", "message": "Pengguna tidak dapat dibuat"}
+            continue
+        status = "registered" if user_id in inserted else "already_registered"
+        inserted.discard(user_id)   # a repeated row is reported as already registered
+        results[r.row] = {
+            "row": r.row,
+            "status": status,
+            "user_id": str(user_id),
+            "user_created": user_id in created_ids,
+        }
+
+    return [results[r.row] for r in rows]
+
+
+async def stream_participant_import(event_id, rows: List[ImportRow]) -> AsyncIterator[bytes]:
+    """
+    Import rows in chunks of IMPORT_CHUNK_ROWS, one transaction each,
+    yielding one NDJSON line per row and a final summary line.
+    """
+    summary = {"rows": len(rows)}
+
+    for start in range(0, len(rows), IMPORT_CHUNK_ROWS):
+        chunk = rows[start:start + IMPORT_CHUNK_ROWS]
+        try:
+            async with AsyncSessionLocal() as session:
+                results = await _import_chunk(session, event_id, chunk)
+        except Exception:
+            # Details stay in the server log; the client only learns the rows failed
+            logger.exception("[Import] Chunk starting at row %s failed", chunk[0].row)
+            results = [
+                {"row": r.row, "status": "error", "code": "IMPORT_FAILED", "message": "Baris gagal diimpor"}
+                for r in chunk
+            ]
+
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+            yield (json.dumps(result) + "\n").encode()
+
+    response_cache.invalidate("events")
+    yield (json.dumps({"summary": summary}) + "\n").encode()
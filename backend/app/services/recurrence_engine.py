@@ -1,18 +1,19 @@
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from app.models.recurrence import Recurrence
 from app.models.event import Event
 from app.database.session import AsyncSessionLocal
+from app.core.cache import response_cache
 
 async def generate_recurring_events():
     async with AsyncSessionLocal() as session:
         now = datetime.now(timezone.utc)
 
+        created = 0
+
         recs = (
             await session.execute(
                 select(Recurrence)
-                .options(selectinload(Recurrence.event))
                 .where(Recurrence.active == True)
             )
         ).scalars().all()
@@ -74,9 +75,13 @@ async def generate_recurring_events():
                 slots_available=latest_event.slots_available,
             )
             session.add(new_event)
+            created += 1
 
         await session.commit()
 
+        if created:
+            response_cache.invalidate("events")
+
 def compute_next_occurrence(rec, last_date):
     """Always return timezone-aware datetime."""
     if last_date.tzinfo is None:
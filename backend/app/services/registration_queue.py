@@ -0,0 +1,101 @@
+import os
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Optional, Tuple
+
+from app.database.session import AsyncSessionLocal
+from app.crud import event as event_crud
+
+logger = logging.getLogger(__name__)
+
+REGISTRATION_BATCHING = os.getenv("REGISTRATION_BATCHING", "true").lower() in ("1", "true")
+# How long a drainer waits for more arrivals before committing a batch
+REGISTRATION_BATCH_WINDOW_MS = float(os.getenv("REGISTRATION_BATCH_WINDOW_MS", 5))
+REGISTRATION_BATCH_MAX = int(os.getenv("REGISTRATION_BATCH_MAX", 500))
+# Upper bound on pool connections used for registrations, whatever the burst
+REGISTRATION_MAX_CONNECTIONS = int(os.getenv("REGISTRATION_MAX_CONNECTIONS", 4))
+
+
+# ---------------------------------------------------------
+# Registration admission queue
+#
+# Requests for the same event wait in one FIFO list. A single
+# drainer per event takes up to REGISTRATION_BATCH_MAX of them
+# at a time and registers the whole batch in one transaction
+# (crud.event.register_batch), so winners follow arrival order
+# and a burst of N requests costs N / batch transactions.
+# ---------------------------------------------------------
+class RegistrationQueue:
+    def __init__(
+        self,
+        window_ms: float = REGISTRATION_BATCH_WINDOW_MS,
+        max_batch: int = REGISTRATION_BATCH_MAX,
+        max_connections: int = REGISTRATION_MAX_CONNECTIONS,
+    ):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.max_connections = max_connections
+        self._pending = defaultdict(list)   # event_id -> [(user_id, future)]
+        self._drainers: dict = {}
+        self._connections: Optional[asyncio.Semaphore] = None
+
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, event_id, user_id) -> Tuple[str, Optional[int]]:
+        """Queue one registration and wait for its (outcome, slots_remaining)."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[event_id].append((user_id, future))
+        self.requests += 1
+
+        if event_id not in self._drainers:
+            self._drainers[event_id] = asyncio.create_task(self._drain(event_id))
+
+        return await future
+
+    async def _drain(self, event_id):
+        if self._connections is None:
+            self._connections = asyncio.Semaphore(self.max_connections)
+
+        try:
+            while self._pending.get(event_id):
+                await asyncio.sleep(self.window)
+
+                queue = self._pending[event_id]
+                batch, self._pending[event_id] = queue[:self.max_batch], queue[self.max_batch:]
+
+                async with self._connections:
+                    await self._register(event_id, batch)
+        finally:
+            self._pending.pop(event_id, None)
+            del self._drainers[event_id]
+
+    async def _register(self, event_id, batch):
+        try:
+            async with AsyncSessionLocal() as session:
+                results = await event_crud.register_batch(
+                    session, event_id, [user_id for user_id, _ in batch]
+                )
+        except Exception as exc:
+            logger.exception("[Registration] Batch for event %s failed: %s", event_id, exc)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        for (_, future), result in zip(batch, results):
+            if not future.done():   # the request may have been cancelled
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "pending": sum(len(q) for q in self._pending.values()),
+            "events_draining": len(self._drainers),
+        }
+
+
+registration_queue = RegistrationQueue()
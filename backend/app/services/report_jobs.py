@@ -0,0 +1,311 @@
+import os
+import csv
+import time
+import uuid
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from app.database.session import AsyncSessionLocal
+from app.crud import attendance as attendance_crud
+from app.models.event import Event
+from app.services.attendance_export import (
+    REPORT_HEADER,
+    report_row,
+    report_heading,
+    stream_xlsx,
+    render_attendance_pdf_async,
+    EXPORT_FETCH_ROWS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Reports generated at once; the rest wait in the queue
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", 2))
+REPORT_MAX_QUEUED = int(os.getenv("REPORT_MAX_QUEUED", 50))
+REPORT_SPOOL_DIR = os.getenv("REPORT_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "village-reports"))
+# Finished files are dropped after the TTL, least recently downloaded
+# first once the spool grows past the size cap
+REPORT_SPOOL_MAX_MB = int(os.getenv("REPORT_SPOOL_MAX_MB", 200))
+REPORT_TTL_SECONDS = int(os.getenv("REPORT_TTL_SECONDS", 900))
+# A PDF is laid out from all of its rows in memory; bigger reports
+# have to use xlsx or csv, which are written as they stream
+REPORT_PDF_MAX_ROWS = int(os.getenv("REPORT_PDF_MAX_ROWS", 50_000))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# format -> (media type, file extension)
+REPORT_FORMATS = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "pdf": ("application/pdf", "pdf"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+class ReportQueueFull(Exception):
+    pass
+
+
+class ReportJob:
+    __slots__ = (
+        "id", "key", "format", "event_id", "start_date", "end_date",
+        "status", "rows_done", "rows_total", "path", "size", "error",
+        "created_at", "finished_at", "last_access",
+    )
+
+    def __init__(self, key, fmt, event_id, start_date, end_date):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.format = fmt
+        self.event_id = event_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status = QUEUED
+        self.rows_done = 0
+        self.rows_total: Optional[int] = None
+        self.path: Optional[Path] = None
+        self.size = 0
+        self.error: Optional[str] = None
+        self.created_at = self.last_access = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def media_type(self) -> str:
+        return REPORT_FORMATS[self.format][0]
+
+    @property
+    def filename(self) -> str:
+        return f"attendance.{REPORT_FORMATS[self.format][1]}"
+
+    def to_dict(self) -> dict:
+        progress = None
+        if self.status == DONE:
+            progress = 1.0
+        elif self.rows_total:
+            progress = round(min(self.rows_done / self.rows_total, 1.0), 3)
+        return {
+            "id": self.id,
+            "status": self.status,
+            "format": self.format,
+            "event_id": str(self.event_id) if self.event_id else None,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "rows_done": self.rows_done,
+            "rows_total": self.rows_total,
+            "progress": progress,
+            "size": self.size if self.status == DONE else None,
+            "error": self.error,
+        }
+
+
+# ---------------------------------------------------------
+# Report job manager
+#
+# POSTed exports become jobs on an asyncio queue served by
+# REPORT_WORKERS tasks, so a year-long export never occupies a
+# request. Finished files live in REPORT_SPOOL_DIR until they
+# expire. Jobs are kept in process memory: with several server
+# processes, poll and download from the one that accepted the job.
+# ---------------------------------------------------------
+class ReportJobManager:
+    def __init__(
+        self,
+        workers: int = REPORT_WORKERS,
+        spool_dir: str = REPORT_SPOOL_DIR,
+        max_bytes: int = REPORT_SPOOL_MAX_MB * 1024 * 1024,
+        ttl_seconds: int = REPORT_TTL_SECONDS,
+        max_queued: int = REPORT_MAX_QUEUED,
+    ):
+        self.workers = workers
+        self.spool_dir = Path(spool_dir)
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.max_queued = max_queued
+        self._jobs: dict = {}     # id -> ReportJob
+        self._by_key: dict = {}   # parameters -> id of the job producing them
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.evicted = 0
+
+    def submit(self, fmt: str, event_id=None, start_date=None, end_date=None) -> ReportJob:
+        """Queue a report, or return the live job for the same parameters."""
+        self._evict()
+        self._start()
+
+        key = (fmt, str(event_id) if event_id else None, start_date, end_date)
+        job = self._jobs.get(self._by_key.get(key))
+        if job is not None and job.status != FAILED:
+            job.last_access = time.time()
+            self.deduplicated += 1
+            return job
+
+        if self._queue.qsize() >= self.max_queued:
+            raise ReportQueueFull()
+
+        job = ReportJob(key, fmt, event_id, start_date, end_date)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        self._evict()
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.last_access = time.time()
+        return job
+
+    # -----------------------------------------------------
+    # Workers
+    # -----------------------------------------------------
+    def _start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        for leftover in self.spool_dir.glob("report-*"):   # from a previous process
+            leftover.unlink(missing_ok=True)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            partial = self.spool_dir / f"report-{job.id}.part"
+            try:
+                job.status = RUNNING
+                await self._run(job, partial)
+            except asyncio.CancelledError:
+                partial.unlink(missing_ok=True)
+                raise
+            except Exception as exc:
+                logger.exception("[Reports] Job %s failed: %s", job.id, exc)
+                partial.unlink(missing_ok=True)
+                job.status = FAILED
+                job.error = str(exc) or exc.__class__.__name__
+                job.finished_at = time.time()
+            finally:
+                self._queue.task_done()
+            self._evict()
+
+    async def _run(self, job: ReportJob, partial: Path):
+        query = attendance_crud.attendance_report_query(job.event_id, job.start_date, job.end_date)
+
+        async with AsyncSessionLocal() as session:
+            job.rows_total = (await session.execute(
+                select(func.count()).select_from(query.order_by(None).subquery())
+            )).scalar_one()
+            if job.format == "pdf" and job.rows_total > REPORT_PDF_MAX_ROWS:
+                raise ValueError(f"Laporan PDF melebihi {REPORT_PDF_MAX_ROWS} baris; gunakan format xlsx atau csv")
+            event_title = None
+            if job.event_id:
+                event_title = (await session.execute(
+                    select(Event.title).where(Event.id == job.event_id)
+                )).scalar_one_or_none()
+
+        def counted(r):
+            job.rows_done += 1
+            return report_row(r)
+
+        # File writes run in a thread so a slow spool disk never stalls the loop
+        if job.format == "xlsx":
+            with open(partial, "wb") as f:
+                async for chunk in stream_xlsx(query, "Attendance Report", REPORT_HEADER, counted):
+                    await asyncio.to_thread(f.write, chunk)
+
+        elif job.format == "csv":
+            with open(partial, "w", newline="", encoding="utf-8-sig") as f:
+                writer = csv.writer(f)
+                writer.writerow(REPORT_HEADER)
+                async for part in self._partitions(query):
+                    await asyncio.to_thread(writer.writerows, [counted(r) for r in part])
+
+        else:
+            rows = []
+            # the cap again, in case rows were added since the count
+            async for part in self._partitions(query.limit(REPORT_PDF_MAX_ROWS + 1)):
+                rows.extend(tuple(r) for r in part)
+                job.rows_done = len(rows)
+            if len(rows) > REPORT_PDF_MAX_ROWS:
+                raise ValueError(f"Laporan PDF melebihi {REPORT_PDF_MAX_ROWS} baris; gunakan format xlsx atau csv")
+            title, period = report_heading(event_title, job.start_date, job.end_date)
+            pdf = await render_attendance_pdf_async(title, period, rows)
+            await asyncio.to_thread(partial.write_bytes, pdf)
+
+        size = partial.stat().st_size
+        if size > self.max_bytes:
+            raise ValueError("Laporan melebihi batas ukuran penyimpanan")
+
+        path = self.spool_dir / f"report-{job.id}.{REPORT_FORMATS[job.format][1]}"
+        partial.replace(path)
+        job.path, job.size = path, size
+        job.finished_at = job.last_access = time.time()
+        job.status = DONE
+
+    @staticmethod
+    async def _partitions(query):
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query.execution_options(yield_per=EXPORT_FETCH_ROWS))
+            async for part in result.partitions():
+                yield part
+
+    # -----------------------------------------------------
+    # Eviction
+    # -----------------------------------------------------
+    def _drop(self, job: ReportJob):
+        if job.path is not None:
+            job.path.unlink(missing_ok=True)
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) == job.id:
+            del self._by_key[job.key]
+        self.evicted += 1
+
+    def _evict(self):
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.status in (DONE, FAILED)]
+
+        for job in finished:
+            if job.finished_at + self.ttl < now:
+                self._drop(job)
+
+        done = sorted(
+            (j for j in finished if j.status == DONE and j.id in self._jobs),
+            key=lambda j: j.last_access,
+        )
+        total = sum(j.size for j in done)
+        for job in done:
+            if total <= self.max_bytes:
+                break
+            total -= job.size
+            self._drop(job)
+
+    def stats(self) -> dict:
+        statuses = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+            "jobs": statuses,
+            "spool_bytes": sum(j.size for j in self._jobs.values() if j.status == DONE),
+        }
+
+
+report_jobs = ReportJobManager()
@@ -0,0 +1,101 @@
+"""
+Compare the old leading-wildcard ILIKE search with the tsvector search
+used by GET /api/events?q=.
+
+Seeds 100k events inside a transaction that is rolled back at the end,
+so it can be pointed at a dev database that has been migrated to head:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_event_search.py
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import random
+import time
+from sqlalchemy import text
+
+from app.database.session import engine
+
+N_EVENTS = int(os.getenv("BENCH_EVENTS", 100_000))
+REPEAT = 20
+
+WORDS = [
+    "gotong", "royong", "posyandu", "kerja", "bakti", "pengajian", "senam",
+    "pasar", "lomba", "rapat", "warga", "balai", "desa", "panen", "sehat",
+    "bersih", "sungai", "musyawarah", "karang", "taruna", "arisan", "ronda",
+]
+
+ILIKE_SQL = """
+    SELECT id FROM events
+    WHERE title ILIKE :like OR description ILIKE :like
+    ORDER BY event_date, id
+    LIMIT 50
+"""
+
+TSVECTOR_SQL = """
+    SELECT id, ts_rank(search_vector, to_tsquery('simple', :tsq)) AS rank FROM events
+    WHERE search_vector @@ to_tsquery('simple', :tsq)
+    ORDER BY rank DESC, event_date, id
+    LIMIT 50
+"""
+
+
+def _phrase(n):
+    return " ".join(random.choice(WORDS) for _ in range(n))
+
+
+async def _time(conn, sql, params):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        await conn.execute(text(sql), params)
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+async def _plan(conn, sql, params):
+    rows = await conn.execute(text("EXPLAIN " + sql), params)
+    return rows.first()[0]
+
+
+async def main():
+    random.seed(42)
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            print(f"Seeding {N_EVENTS} events...")
+            await conn.execute(
+                text("""
+                    INSERT INTO events (title, description, location, event_date,
+                                        requires_registration, is_cancelled)
+                    VALUES (:title, :description, 'Balai Desa',
+                            now() + make_interval(days => :offset), false, false)
+                """),
+                [
+                    {
+                        "title": _phrase(3).title(),
+                        "description": _phrase(25),
+                        "offset": random.randint(-365, 365),
+                    }
+                    for _ in range(N_EVENTS)
+                ],
+            )
+            await conn.execute(text("ANALYZE events"))
+
+            for term in ("posyandu", "gotong roy", "musyawarah desa"):
+                like = {"like": f"%{term}%"}
+                tsq = {"tsq": " & ".join(f"{w}:*" for w in term.split())}
+
+                ilike_ms = await _time(conn, ILIKE_SQL, like)
+                ts_ms = await _time(conn, TSVECTOR_SQL, tsq)
+
+                print(f"\nq={term!r}")
+                print(f"  ilike    {ilike_ms:8.2f} ms   {await _plan(conn, ILIKE_SQL, like)}")
+                print(f"  tsvector {ts_ms:8.2f} ms   {await _plan(conn, TSVECTOR_SQL, tsq)}")
+        finally:
+            await trans.rollback()
+
+    await engine.dispose()
+
+
+asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Microbenchmark: old from_orm().dict() + jsonable_encoder + json.dumps
+response path against app.core.responses (validate once, dump to bytes).
+
+No database needed; 5k event-shaped objects are built in memory:
+
+    python scripts/bench_serialization.py
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import json
+import time
+import uuid
+import warnings
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas.event import EventOut
+from app.core.responses import envelope, serialize
+
+N_EVENTS = int(os.getenv("BENCH_EVENTS", 5000))
+REPEAT = 5
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+def make_events(n):
+    now = datetime.now(timezone.utc)
+    events = []
+    for i in range(n):
+        events.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            title=f"Gotong Royong RT {i % 12:02d}",
+            description="Kerja bakti membersihkan saluran air dan halaman balai desa. " * 4,
+            location="Balai Desa",
+            event_date=now + timedelta(days=i % 365),
+            created_at=now,
+            updated_at=now,
+            is_cancelled=False,
+            requires_registration=bool(i % 2),
+            slots_available=50,
+            media=[
+                SimpleNamespace(
+                    id=uuid.uuid4(),
+                    file_url=f"https://example.supabase.co/storage/v1/object/public/event-banners/events/{i}/media/banner.jpg",
+                    file_type="banner",
+                    uploaded_at=now,
+                )
+            ],
+        ))
+    return events
+
+
+def old_path(events):
+    payload = {"success": True, "data": [EventOut.from_orm(e).dict() for e in events]}
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def new_path(events):
+    return envelope(serialize(EventOut, events, many=True))
+
+
+def bench(fn, events):
+    fn(events)  # warm up (builds the cached TypeAdapter)
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        body = fn(events)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, len(body)
+
+
+if __name__ == "__main__":
+    events = make_events(N_EVENTS)
+
+    old_ms, old_size = bench(old_path, events)
+    new_ms, new_size = bench(new_path, events)
+
+    # Same payload; pydantic-core writes UTC offsets as "Z" instead of "+00:00"
+    assert old_path(events[:10]).decode() == new_path(events[:10]).decode().replace('Z"', '+00:00"')
+
+    print(f"{N_EVENTS} events, best of {REPEAT}")
+    print(f"  from_orm().dict() + json.dumps  {old_ms:8.1f} ms  {old_size:>9} bytes")
+    print(f"  TypeAdapter.dump_json           {new_ms:8.1f} ms  {new_size:>9} bytes")
+    print(f"  speedup                         {old_ms / new_ms:8.1f}x")
@@ -0,0 +1,341 @@
+"""
+Query-plan regression check for app/crud.
+
+Seeds a village-sized dataset inside a transaction that is rolled back
+at the end, runs the hot crud functions against it, and EXPLAINs every
+statement they send. A check fails when a plan sequentially scans one
+of the large tables it was not expected to scan, or when the function
+sends more statements than its budget (an N+1 creeping in). The hot
+HTTP endpoints are then called in-process against the same data, with
+the response cache cleared, and their statement counts checked the same
+way:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/check_query_plans.py
+
+Exits non-zero on any failure. Point it at a dev database migrated to
+head; nothing is left behind.
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+from datetime import date, timedelta
+
+import httpx
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from app.core.cache import response_cache
+from app.core.security import create_access_token
+from app.database.session import engine, get_session
+from app import crud
+from app.crud import recurrence as recurrence_crud
+from app.routes import event as event_routes
+
+N_EVENTS = int(os.getenv("PLAN_EVENTS", 20_000))
+N_USERS = int(os.getenv("PLAN_USERS", 20_000))
+REGISTRATIONS_PER_USER = 10
+
+LARGE_TABLES = {
+    "events", "users", "participants", "roles", "schedules",
+    "event_media", "recurrences", "attendances", "attendance_rollups",
+}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, phone, full_name, hashed_password, is_admin, is_active)
+    SELECT 'plan-' || g || '@example.com', '0899' || lpad(g::text, 8, '0'),
+           'Warga ' || g, 'x', false, true
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO events (title, description, location, event_date,
+                        requires_registration, slots_available, is_cancelled)
+    SELECT 'plan-check ' || g, 'Kerja bakti warga RT ' || (g % 12), 'Balai Desa',
+           now() + make_interval(days => (g % 730) - 365), true, 500, false
+    FROM generate_series(1, :events) g
+    """,
+    """
+    WITH e AS (
+        SELECT id, row_number() OVER (ORDER BY id) - 1 AS n
+        FROM events WHERE title LIKE 'plan-check %'
+    ), u AS (
+        SELECT id, row_number() OVER (ORDER BY id) AS n
+        FROM users WHERE email LIKE 'plan-%@example.com'
+    )
+    INSERT INTO participants (event_id, user_id)
+    SELECT e.id, u.id
+    FROM u CROSS JOIN generate_series(1, :per_user) k
+    JOIN e ON e.n = (u.n * 7 + k * 131) % :events
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO roles (event_id, role_name, slots_required)
+    SELECT e.id, 'Peran ' || k, 2
+    FROM events e CROSS JOIN generate_series(1, 3) k
+    WHERE e.title LIKE 'plan-check %'
+    """,
+    """
+    INSERT INTO event_media (event_id, file_url, file_type, uploaded_at)
+    SELECT e.id, 'https://example.com/' || e.id || '/' || k || '.jpg', 'banner',
+           now() - make_interval(mins => k)
+    FROM events e CROSS JOIN generate_series(1, 2) k
+    WHERE e.title LIKE 'plan-check %'
+    """,
+    """
+    INSERT INTO recurrences (event_id, start_date, frequency, interval, active)
+    SELECT e.id, e.event_date, 'weekly', 1, (row_number() OVER (ORDER BY e.id)) % 20 = 0
+    FROM events e
+    WHERE e.title LIKE 'plan-check %'
+    """,
+    """
+    INSERT INTO schedules (event_id, activity, start_time, status)
+    SELECT e.id, 'Kegiatan ' || k, e.event_date + make_interval(hours => k), 'pending'
+    FROM events e CROSS JOIN generate_series(1, 2) k
+    WHERE e.title LIKE 'plan-check %'
+    """,
+    """
+    INSERT INTO attendances (event_id, participant_id, attended_at, attendance_day)
+    SELECT p.event_id, p.id, now() - make_interval(days => k), current_date - k
+    FROM participants p
+    JOIN events e ON e.id = p.event_id AND e.title LIKE 'plan-check %'
+    CROSS JOIN generate_series(1, 2) k
+    """,
+    """
+    INSERT INTO attendance_rollups
+        (event_id, participant_id, month, attended_count, first_attended_at, last_attended_at)
+    SELECT a.event_id, a.participant_id, date_trunc('month', a.attendance_day)::date,
+           count(*), min(a.attended_at), max(a.attended_at)
+    FROM attendances a
+    JOIN events e ON e.id = a.event_id AND e.title LIKE 'plan-check %'
+    GROUP BY 1, 2, 3
+    """,
+    """
+    UPDATE events e SET registered_count = c.n
+    FROM (SELECT event_id, count(*) AS n FROM participants GROUP BY event_id) c
+    WHERE c.event_id = e.id AND e.title LIKE 'plan-check %'
+    """,
+]
+
+
+async def seed(conn):
+    params = {"users": N_USERS, "events": N_EVENTS, "per_user": REGISTRATIONS_PER_USER}
+    for sql in SEED_SQL:
+        await conn.execute(text(sql), {k: v for k, v in params.items() if f":{k}" in sql})
+    await conn.execute(text("ANALYZE"))
+
+    row = (await conn.execute(text("""
+        SELECT p.event_id, p.user_id, u.email, u.phone, r.id AS role_id
+        FROM participants p
+        JOIN users u ON u.id = p.user_id
+        JOIN roles r ON r.event_id = p.event_id
+        WHERE u.email LIKE 'plan-%@example.com'
+        LIMIT 1
+    """))).one()
+    spare_user = (await conn.execute(text("""
+        INSERT INTO users (email, full_name, hashed_password, is_admin, is_active)
+        VALUES ('plan-spare@example.com', 'Warga Baru', 'x', false, true)
+        RETURNING id
+    """))).scalar_one()
+    return row, spare_user
+
+
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT")
+
+
+# (name, call, large tables a seq scan is acceptable on, max statements)
+def checks(ids, spare_user):
+    today = date.today()
+    return [
+        ("event.get_event detail", lambda s: crud.event.get_event(s, ids.event_id, "detail"), set(), 3),
+        ("event.version", lambda s: crud.event.version(s, ids.event_id), set(), 1),
+        # one aggregate over every event and media row, answered before a
+        # list page is loaded; that is cheaper than the page itself
+        ("event.list_version", lambda s: crud.event.list_version(s), {"events", "event_media"}, 1),
+        ("event.list_events upcoming", lambda s: crud.event.list_events(s, None, True, 50), set(), 2),
+        # prefix tsqueries get a fixed selectivity guess (~2%), so the planner
+        # filters the table instead of using ix_events_search_vector
+        ("event.list_events q", lambda s: crud.event.list_events(s, "1234", False, 50), {"events"}, 2),
+        ("event.calendar_days", lambda s: crud.event.calendar_days(s, today.replace(day=1), today.replace(day=28), "Asia/Jakarta"), set(), 1),
+        ("event.register_participant", lambda s: crud.event.register_participant(s, ids.event_id, spare_user), set(), 1),
+        ("event.release_user_registrations", lambda s: crud.event.release_user_registrations(s, ids.user_id), set(), 1),
+        ("participation.list_participants_with_user", lambda s: crud.participation.list_participants_with_user(s, ids.event_id), set(), 1),
+        ("role.list_roles", lambda s: crud.role.list_roles(s, ids.event_id), set(), 1),
+        ("role.collection_version", lambda s: crud.role.collection_version(s, ids.event_id), set(), 1),
+        ("role.assign_role", lambda s: crud.role.assign_role(s, ids.role_id, ids.user_id, ids.event_id), set(), 2),
+        ("recurrence.get_by_event", lambda s: recurrence_crud.get_by_event(s, ids.event_id), set(), 1),
+        ("attendance.list_attendances_for_event", lambda s: crud.attendance.list_attendances_for_event(s, ids.event_id), set(), 1),
+        ("attendance.attendance_report", lambda s: crud.attendance.attendance_report(s, ids.event_id, today - timedelta(days=30), today), set(), 1),
+        # the top-attendee branch maps every rollup row of the month to a
+        # user; Postgres hashes participants/users rather than probing per row
+        ("attendance.monthly_report", lambda s: crud.attendance.monthly_report(s, today.replace(day=1), today.replace(day=1), "Asia/Jakarta"), {"participants", "users", "attendance_rollups"}, 1),
+        ("attendance.attendance_report year", lambda s: crud.attendance.attendance_report(s, ids.event_id, date(today.year, 1, 1), date(today.year, 12, 31)), set(), 1),
+        ("user.get_by_email", lambda s: crud.user.get_by_email(s, ids.email), set(), 1),
+        ("user.get_by_phone", lambda s: crud.user.get_by_phone(s, ids.phone), set(), 1),
+        ("user.find_by_emails_or_phones", lambda s: crud.user.find_by_emails_or_phones(s, [ids.email], [ids.phone]), set(), 1),
+    ]
+
+
+async def seed_endpoint_users(conn):
+    """An admin to call the admin endpoints with, and a user who registers."""
+    result = await conn.execute(text("""
+        INSERT INTO users (email, full_name, hashed_password, is_admin, is_active)
+        VALUES ('plan-admin@example.com', 'Admin Desa', 'x', true, true),
+               ('plan-walk-in@example.com', 'Warga Datang', 'x', false, true)
+        RETURNING id
+    """))
+    admin, walk_in = result.scalars().all()
+    return admin, walk_in
+
+
+# (name, method, path, params, caller, max statements), counted with the
+# response cache cleared. Budgets are the counts observed on PostgreSQL
+# 16; authenticated calls include the user lookup in get_current_user.
+def endpoint_checks(ids, admin, walk_in):
+    today = date.today()
+    month_start = today.replace(day=1)
+    return [
+        ("GET /api/events", "GET", "/api/events", {}, None, 3),
+        ("GET /api/events?upcoming", "GET", "/api/events", {"upcoming": "true"}, None, 3),
+        ("GET /api/events?q", "GET", "/api/events", {"q": "1234"}, None, 3),
+        ("GET /api/events?fields", "GET", "/api/events", {"fields": "id,title,slots_remaining"}, None, 2),
+        ("GET /api/events/calendar", "GET", "/api/events/calendar", {"from": month_start.isoformat(), "to": (month_start + timedelta(days=27)).isoformat()}, None, 1),
+        ("GET /api/events/{id}", "GET", f"/api/events/{ids.event_id}", {}, None, 4),
+        ("POST /api/events/{id}/register", "POST", f"/api/events/{ids.event_id}/register", {}, walk_in, 2),
+        ("GET /api/roles?event_id", "GET", "/api/roles", {"event_id": str(ids.event_id)}, None, 2),
+        ("GET /api/participants/{event_id}", "GET", f"/api/participants/{ids.event_id}", {}, None, 2),
+        ("GET /api/announcements", "GET", "/api/announcements", {}, None, 2),
+        ("GET /api/users", "GET", "/api/users", {}, admin, 3),
+        ("GET /api/attendance/report", "GET", "/api/attendance/report", {"event_id": str(ids.event_id), "start_date": (today - timedelta(days=30)).isoformat(), "end_date": today.isoformat()}, admin, 2),
+        ("GET /api/attendance/reports/monthly", "GET", "/api/attendance/reports/monthly", {"start_date": month_start.isoformat(), "end_date": today.isoformat()}, admin, 2),
+    ]
+
+
+async def check_endpoints(conn, ids, capture, captured) -> int:
+    admin, walk_in = await seed_endpoint_users(conn)
+    with contextlib.redirect_stdout(io.StringIO()):   # create_access_token logs every token
+        tokens = {u: create_access_token(str(u)) for u in (admin, walk_in)}
+
+    async def session_on_seeded_connection():
+        async with AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session_on_seeded_connection
+    event_routes.REGISTRATION_BATCHING = False   # the queue opens its own connections
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://plan-check") as client:
+        for name, method, path, params, caller, max_queries in endpoint_checks(ids, admin, walk_in):
+            response_cache.clear()
+            headers = {"Authorization": f"Bearer {tokens[caller]}"} if caller else {}
+            captured.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                res = await client.request(method, path, params=params, headers=headers)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+            sent = [
+                statement for statement, _ in captured
+                if statement.lstrip().split(None, 1)[0].upper() not in TRANSACTION_CONTROL
+            ]
+            bad = res.status_code >= 400 or len(sent) > max_queries
+            failures += bad
+            print(f"  {'FAIL' if bad else 'ok':<4}  {name:<42} {res.status_code}, {len(sent)} statement(s), budget {max_queries}")
+            if bad:
+                for statement in sent:
+                    print(f"        {' '.join(statement.split())[:110]}")
+
+    app.dependency_overrides.pop(get_session, None)
+    return failures
+
+
+def seq_scans(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def indexes_used(plan):
+    found = [plan["Index Name"]] if "Index Name" in plan else []
+    for child in plan.get("Plans", []):
+        found.extend(indexes_used(child))
+    return found
+
+
+async def main():
+    failures = 0
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            print(f"Seeding {N_EVENTS} events, {N_USERS} users...")
+            ids, spare_user = await seed(conn)
+
+            captured = []
+
+            def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+                captured.append((statement, parameters))
+
+            for name, call, allowed, max_queries in checks(ids, spare_user):
+                captured.clear()
+                session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+                event.listen(engine.sync_engine, "before_cursor_execute", capture)
+                try:
+                    await call(session)
+                except Exception as exc:   # e.g. HTTPException from a capacity check
+                    print(f"  note  {name}: {exc!r}")
+                finally:
+                    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+                    await session.close()
+
+                sent = [
+                    (statement, parameters) for statement, parameters in captured
+                    if statement.lstrip().split(None, 1)[0].upper() not in TRANSACTION_CONTROL
+                ]
+                over = len(sent) > max_queries
+                failures += over
+                print(f"  {'FAIL' if over else 'ok':<4}  {name:<42} {len(sent)} statement(s), budget {max_queries}")
+
+                for statement, parameters in sent:
+                    if statement.lstrip().split(None, 1)[0].upper() == "INSERT":
+                        continue
+                    result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+                    plan = result.scalar_one()
+                    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+                    bad = sorted({t for t in seq_scans(plan) if t in LARGE_TABLES} - allowed)
+                    status = "FAIL" if bad else "ok"
+                    failures += bool(bad)
+                    summary = " ".join(statement.split())[:90]
+                    print(f"  {status:<4}  {name:<42} {summary}")
+                    if bad:
+                        print(f"        seq scan on: {', '.join(bad)}")
+                    used = sorted(set(indexes_used(plan)))
+                    if used:
+                        print(f"        indexes: {', '.join(used)}")
+
+            print("\nEndpoints:")
+            failures += await check_endpoints(conn, ids, capture, captured)
+        finally:
+            await trans.rollback()
+
+    await engine.dispose()
+
+    print(f"\n{failures} failure(s): unexpected sequential scans or query budgets exceeded")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""
+Fire simultaneous registrations at one event and check that it is
+never overbooked. Default: 500 users racing for 100 slots.
+
+Requests go through POST /api/events/{id}/register in-process (httpx
+ASGITransport), so authentication and the request session are part
+of the measurement. The burst runs twice, once with direct
+per-request transactions and once through the admission queue
+(REGISTRATION_BATCHING), and reports wall time and the peak number of
+pool connections checked out.
+
+Creates throwaway events and users, and deletes them at the end, so
+it can be pointed at a local database that has been migrated to head:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/load_registration.py
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import contextlib
+import io
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import delete, func, insert, select
+
+from app.main import app
+from app.core.security import create_access_token
+from app.database.session import AsyncSessionLocal, engine
+from app.models.event import Event
+from app.models.participant import Participant
+from app.models.user import User
+from app.routes import event as event_routes
+from app.services.registration_queue import registration_queue
+
+N_USERS = int(os.getenv("LOAD_USERS", 500))
+N_SLOTS = int(os.getenv("LOAD_SLOTS", 100))
+
+
+async def setup(tag):
+    async with AsyncSessionLocal() as session:
+        event_id = (await session.execute(
+            insert(Event).values(
+                title=f"Load test {tag}",
+                location="Balai Desa",
+                event_date=datetime.now(timezone.utc) + timedelta(days=7),
+                requires_registration=True,
+                slots_available=N_SLOTS,
+            ).returning(Event.id)
+        )).scalar_one()
+
+        user_ids = (await session.execute(
+            insert(User).returning(User.id),
+            [
+                {"email": f"load-{tag}-{i}@example.com", "hashed_password": "x"}
+                for i in range(N_USERS)
+            ],
+        )).scalars().all()
+
+        await session.commit()
+    return event_id, user_ids
+
+
+async def teardown(event_id, user_ids):
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Event).where(Event.id == event_id))
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.commit()
+
+
+async def register(client, event_id, token):
+    res = await client.post(
+        f"/api/events/{event_id}/register",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    if res.status_code == 200:
+        return "registered"
+    return f"{res.status_code} {res.json().get('detail')}"
+
+
+async def sample_pool(peak, stop):
+    while not stop.is_set():
+        peak[0] = max(peak[0], engine.pool.checkedout())
+        await asyncio.sleep(0.001)
+
+
+async def run(label, batching):
+    event_routes.REGISTRATION_BATCHING = batching
+    tag = uuid.uuid4().hex[:8]
+    event_id, user_ids = await setup(tag)
+    with contextlib.redirect_stdout(io.StringIO()):   # create_access_token logs every token
+        tokens = [create_access_token(str(u)) for u in user_ids]
+
+    try:
+        peak, stop = [0], asyncio.Event()
+        sampler = asyncio.create_task(sample_pool(peak, stop))
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(*(register(client, event_id, t) for t in tokens))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await sampler
+
+        async with AsyncSessionLocal() as session:
+            stored = (await session.execute(
+                select(func.count(Participant.id)).where(Participant.event_id == event_id)
+            )).scalar_one()
+            registered_count = (await session.execute(
+                select(Event.registered_count).where(Event.id == event_id)
+            )).scalar_one()
+
+        tally = Counter(outcomes)
+        print(f"[{label}] {N_USERS} registrations for {N_SLOTS} slots in {elapsed:.2f}s")
+        for outcome, n in sorted(tally.items()):
+            print(f"  {outcome:<40} {n}")
+        print(f"  participants {stored}, registered_count {registered_count}")
+        print(f"  peak pool connections {peak[0]}")
+
+        expected = min(N_USERS, N_SLOTS)
+        assert tally["registered"] == expected, "wrong number of successful registrations"
+        assert registered_count == expected == stored, (
+            f"registered_count {registered_count}, slots {expected}, participants {stored}"
+        )
+    finally:
+        await teardown(event_id, user_ids)
+
+
+async def main():
+    try:
+        await run("direct", False)
+        await run("queued", True)
+        print(f"  batches {registration_queue.batches}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
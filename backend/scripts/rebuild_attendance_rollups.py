@@ -0,0 +1,30 @@
+"""
+Recompute attendance_rollups from the attendances table, e.g. after a
+manual data fix or to backfill a restored database:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/rebuild_attendance_rollups.py
+
+Runs in one transaction; attendance writes wait until it commits.
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import time
+
+from app.database.session import AsyncSessionLocal, engine
+from app import crud
+
+
+async def main():
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            rows = await crud.attendance.rebuild_rollups(session)
+    finally:
+        await engine.dispose()
+    print(f"Rebuilt {rows} rollup rows in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -129,9 +129,24 @@ export async function deleteUser(id) {
 /* ---------------------------------------------------
    EVENTS
 --------------------------------------------------- */
+// Without an explicit limit/cursor, walk every page so callers get the full list
 export async function fetchEvents(params = {}) {
-  const res = await api.get("/events", { params });
-  return res.data;
+  if (params.limit || params.cursor) {
+    const res = await api.get("/events", { params });
+    return res.data;
+  }
+
+  const data = [];
+  let cursor = null;
+  do {
+    const res = await api.get("/events", {
+      params: { ...params, limit: 200, ...(cursor ? { cursor } : {}) },
+    });
+    data.push(...(res.data.data || []));
+    cursor = res.data.next_cursor;
+  } while (cursor);
+
+  return { success: true, data, next_cursor: null };
 }
 
 export async function fetchEvent(id) {
@@ -200,6 +215,12 @@ export async function assignRole(participantId, roleId) {
   return res.data;
 }
 
+// assignments: { [participantId]: roleId | null }
+export async function assignRolesBulk(assignments) {
+  const res = await api.put(`/participants/assign-roles`, { assignments });
+  return res.data;
+}
+
 export async function unassignRole(participantId) {
   const res = await api.put(`/participants/${participantId}/unassign-role`);
   return res.data;
@@ -287,6 +308,11 @@ export async function bulkMarkAttendance(eventId, rows) {
   return res.data;
 }
 
+export async function syncAttendance(ops) {
+  const res = await api.post(`/attendance/sync`, { ops });
+  return res.data;
+}
+
 export async function fetchMyAttendance(eventId) {
   const res = await api.get(`/attendance/events/${eventId}/me`);
   return res.data;
@@ -297,21 +323,66 @@ export async function monthlyAttendanceReport(opts) {
   return res.data;
 }
 
-export async function exportAttendanceCSV(params) {
-  return api.get(`/attendance/reports/export`, { 
-    params, 
-    responseType: "blob" 
+export async function createReportExport(params) {
+  const res = await api.post(`/attendance/reports/export`, params);
+  return res.data;
+}
+
+export async function fetchReportExport(jobId) {
+  const res = await api.get(`/attendance/reports/export/${jobId}`);
+  return res.data;
+}
+
+export async function downloadReportExport(jobId) {
+  return api.get(`/attendance/reports/export/${jobId}/download`, {
+    responseType: "blob"
   });
 }
 
-export function exportAttendanceExcel(eventId, start, end) {
-  const url = `${API_BASE}/attendance/export/excel?event_id=${eventId}&start_date=${start}&end_date=${end}`;
-  window.open(url, "_blank");
+// Queue a report, poll until it is ready, then save the file
+export async function exportAttendanceReport(params, onProgress) {
+  let job = (await createReportExport(params)).data;
+
+  while (job.status === "queued" || job.status === "running") {
+    onProgress?.(job);
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+    job = (await fetchReportExport(job.id)).data;
+  }
+  onProgress?.(job);
+
+  if (job.status !== "done") {
+    throw new Error(job.error || "Gagal membuat laporan");
+  }
+
+  const res = await downloadReportExport(job.id);
+  saveBlob(res.data, `attendance.${job.format}`);
+}
+
+function saveBlob(blob, filename) {
+  const url = URL.createObjectURL(blob);
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = filename;
+  link.click();
+  URL.revokeObjectURL(url);
 }
 
-export function exportAttendancePDF(eventId, start, end) {
-  const url = `${API_BASE}/attendance/export/pdf?event_id=${eventId}&start_date=${start}&end_date=${end}`;
-  window.open(url, "_blank");
+// Exports are admin-only, so they go through axios (which sends the
+// token) rather than window.open
+export async function exportAttendanceExcel(eventId, start, end) {
+  const res = await api.get(`/attendance/export/excel`, {
+    params: { event_id: eventId, start_date: start, end_date: end },
+    responseType: "blob"
+  });
+  saveBlob(res.data, "attendance.xlsx");
+}
+
+export async function exportAttendancePDF(eventId, start, end) {
+  const res = await api.get(`/attendance/export/pdf`, {
+    params: { event_id: eventId, start_date: start, end_date: end },
+    responseType: "blob"
+  });
+  saveBlob(res.data, "attendance.pdf");
 }
 
 /* ---------------------------------------------------
@@ -0,0 +1,72 @@
+import { syncAttendance } from "./api";
+
+/* ---------------------------------------------------
+   OFFLINE ATTENDANCE QUEUE
+   Check-ins taken without signal are kept in
+   localStorage and replayed in one /attendance/sync
+   request. Each entry carries its own idempotency key,
+   so a replay interrupted mid-flight is safe to repeat.
+--------------------------------------------------- */
+const STORAGE_KEY = "attendance-queue-v1";
+const MAX_OPS_PER_SYNC = 1000;
+
+function load() {
+  try {
+    return JSON.parse(localStorage.getItem(STORAGE_KEY)) ?? [];
+  } catch {
+    return [];
+  }
+}
+
+function save(queue) {
+  localStorage.setItem(STORAGE_KEY, JSON.stringify(queue));
+}
+
+export function pendingAttendance() {
+  return load();
+}
+
+export function queueAttendance(action, eventId, participantId) {
+  const queue = load();
+  queue.push({
+    key: crypto.randomUUID(),
+    action, // "check_in" | "undo"
+    event_id: eventId,
+    participant_id: participantId,
+    at: new Date().toISOString(),
+    notes: null,
+  });
+  save(queue);
+}
+
+let flushing = null;
+
+export function flushAttendanceQueue() {
+  if (!flushing) {
+    flushing = flush().finally(() => {
+      flushing = null;
+    });
+  }
+  return flushing;
+}
+
+async function flush() {
+  let synced = 0;
+
+  while (navigator.onLine) {
+    const batch = load().slice(0, MAX_OPS_PER_SYNC);
+    if (batch.length === 0) break;
+
+    const res = await syncAttendance(batch);
+    const watermark = res.data?.watermark;
+    if (!watermark) break;
+
+    // Everything sent at or before the watermark is settled on the server
+    const settled = new Set(batch.map((op) => op.key));
+    const limit = new Date(watermark).getTime();
+    save(load().filter((op) => !(settled.has(op.key) && new Date(op.at).getTime() <= limit)));
+    synced += batch.length;
+  }
+
+  return synced;
+}
@@ -3,10 +3,18 @@ import {
   fetchEvents,
   fetchEventParticipants,
   fetchEventAttendance,
-  markAttendance,
+  bulkMarkAttendance,
   deleteAttendance,
   attendanceReport
 } from "../../api";
+import {
+  pendingAttendance,
+  queueAttendance,
+  flushAttendanceQueue
+} from "../../attendanceQueue";
+
+// Same cap as BULK_ATTENDANCE_MAX_ROWS on the server
+const BULK_MAX_ROWS = 1000;
 
 export default function AttendanceManagement() {
   const [events, setEvents] = useState([]);
@@ -14,6 +22,9 @@ export default function AttendanceManagement() {
 
   const [participants, setParticipants] = useState([]);
   const [attendance, setAttendance] = useState([]);
+  // Participants ticked for check-in, saved together in one bulk request
+  const [selected, setSelected] = useState(new Set());
+  const [saving, setSaving] = useState(false);
 
   const [searchTerm, setSearchTerm] = useState("");
 
@@ -31,9 +42,24 @@ export default function AttendanceManagement() {
 
   useEffect(() => {
     if (!selectedEvent) return;
+    setSelected(new Set());
     loadData();
   }, [selectedEvent]);
 
+  // Replay check-ins queued while offline, now and whenever signal returns
+  useEffect(() => {
+    async function sync() {
+      try {
+        if (await flushAttendanceQueue()) await loadData();
+      } catch (error) {
+        console.warn("Attendance sync failed, will retry:", error);
+      }
+    }
+    sync();
+    window.addEventListener("online", sync);
+    return () => window.removeEventListener("online", sync);
+  }, [selectedEvent]);
+
   async function loadData() {
     try {
       const pRes = await fetchEventParticipants(selectedEvent);
@@ -44,7 +70,7 @@ export default function AttendanceManagement() {
 
       const aRes = await fetchEventAttendance(selectedEvent);
       console.log("Attendance response:", aRes); // Debug log
-      setAttendance(aRes.data ?? aRes ?? []);
+      setAttendance(withPending(aRes.data ?? aRes ?? []));
     } catch (error) {
       console.error("Error loading data:", error);
       setParticipants([]);
@@ -52,27 +78,118 @@ export default function AttendanceManagement() {
     }
   }
 
+  // Apply queued offline ops on top of the server list
+  function withPending(rows) {
+    let result = rows;
+    for (const op of pendingAttendance()) {
+      if (op.event_id !== selectedEvent) continue;
+      result = result.filter((a) => a.participant_id !== op.participant_id);
+      if (op.action === "check_in") {
+        result = [...result, { id: null, participant_id: op.participant_id, offline: true }];
+      }
+    }
+    return result;
+  }
+
+  const toggleSelected = (participantId) => {
+    setSelected((prev) => {
+      const next = new Set(prev);
+      if (next.has(participantId)) next.delete(participantId);
+      else next.add(participantId);
+      return next;
+    });
+  };
+
   const toggleAttendance = async (participant) => {
     const existing = attendance.find((a) => a.participant_id === participant.id);
 
+    // Check-ins are collected and saved with saveSelected()
+    if (!existing) {
+      toggleSelected(participant.id);
+      return;
+    }
+
+    const queueOffline = () => {
+      queueAttendance("undo", selectedEvent, participant.id);
+      setAttendance((rows) => withPending(rows.filter((a) => !a.offline)));
+    };
+
+    if (!navigator.onLine || !existing.id) {
+      queueOffline();
+      return;
+    }
+
     try {
-      if (existing) {
-        await deleteAttendance(existing.id);
-      } else {
-        // Pass participant ID and event ID
-        await markAttendance(participant.id, selectedEvent);
-      }
+      await deleteAttendance(existing.id);
       await loadData();
     } catch (error) {
+      if (!error.response) {
+        // No signal: keep it for /attendance/sync
+        queueOffline();
+        return;
+      }
       console.error("Error toggling attendance:", error);
       alert(error.response?.data?.detail || "Gagal mengubah status kehadiran");
     }
   };
 
+  const saveSelected = async () => {
+    const ids = [...selected];
+    if (ids.length === 0) return;
+
+    const queueOffline = (pending) => {
+      for (const id of pending) queueAttendance("check_in", selectedEvent, id);
+      setAttendance((rows) => withPending(rows.filter((a) => !a.offline)));
+      setSelected(new Set());
+    };
+
+    if (!navigator.onLine) {
+      queueOffline(ids);
+      return;
+    }
+
+    setSaving(true);
+    let saved = 0;
+    try {
+      let invalid = 0;
+      for (; saved < ids.length; saved += BULK_MAX_ROWS) {
+        const chunk = ids.slice(saved, saved + BULK_MAX_ROWS);
+        const res = await bulkMarkAttendance(
+          selectedEvent,
+          chunk.map((participant_id) => ({ participant_id }))
+        );
+        invalid += (res.data ?? []).filter((r) => r.status === "invalid").length;
+      }
+      setSelected(new Set());
+      await loadData();
+      if (invalid) alert(`${invalid} peserta tidak terdaftar di acara ini`);
+    } catch (error) {
+      if (!error.response) {
+        // No signal: chunks already saved are done, queue the rest
+        queueOffline(ids.slice(saved));
+        return;
+      }
+      console.error("Error saving attendance:", error);
+      alert(error.response?.data?.detail || "Gagal menyimpan kehadiran");
+    } finally {
+      setSaving(false);
+    }
+  };
+
   const filtered = participants.filter((p) =>
     p.user_full_name?.toLowerCase().includes(searchTerm.toLowerCase())
   );
 
+  const selectAllFiltered = () => {
+    setSelected((prev) => {
+      const next = new Set(prev);
+      for (const p of filtered) {
+        if (!attendance.some((a) => a.participant_id === p.id)) next.add(p.id);
+      }
+      return next;
+    });
+  };
+
   const generateReport = async () => {
     try {
       const res = await attendanceReport({
@@ -112,6 +229,22 @@ export default function AttendanceManagement() {
             onChange={(e) => setSearchTerm(e.target.value)}
           />
 
+          <div className="flex gap-2">
+            <button
+              onClick={selectAllFiltered}
+              className="px-4 py-1 rounded border"
+            >
+              Pilih Semua
+            </button>
+            <button
+              onClick={saveSelected}
+              disabled={saving || selected.size === 0}
+              className="px-4 py-1 rounded text-white bg-blue-600 disabled:opacity-50"
+            >
+              {saving ? "Menyimpan…" : `Simpan Kehadiran (${selected.size})`}
+            </button>
+          </div>
+
           <div className="space-y-4 mt-4">
             {filtered.length === 0 && (
               <p className="text-gray-500">
@@ -121,6 +254,7 @@ export default function AttendanceManagement() {
 
             {filtered.map((p) => {
               const hadir = attendance.some((a) => a.participant_id === p.id);
+              const dipilih = selected.has(p.id);
 
               return (
                 <div
@@ -137,10 +271,10 @@ export default function AttendanceManagement() {
                   <button
                     onClick={() => toggleAttendance(p)}
                     className={`px-4 py-1 rounded text-white ${
-                      hadir ? "bg-green-700" : "bg-blue-600"
+                      hadir ? "bg-green-700" : dipilih ? "bg-yellow-600" : "bg-blue-600"
                     }`}
                   >
-                    {hadir ? "Hadir" : "Tandai Hadir"}
+                    {hadir ? "Hadir" : dipilih ? "Dipilih" : "Tandai Hadir"}
                   </button>
                 </div>
               );
@@ -1,10 +1,8 @@
 import React, { useEffect, useState } from "react";
 import {
   fetchEvents,
-  attendanceReport,
-  fetchEventParticipants,
-  exportAttendanceExcel,
-  exportAttendancePDF,
+  monthlyAttendanceReport,
+  exportAttendanceReport,
 } from "../../api";
 import { Calendar, FileSpreadsheet, FileText } from "lucide-react";
 
@@ -15,12 +13,16 @@ export default function ReportsAnalytics() {
   const [startDate, setStartDate] = useState("");
   const [endDate, setEndDate] = useState("");
 
+  const [exporting, setExporting] = useState(null);
+
   const [summary, setSummary] = useState({
     totalEvents: 0,
     totalParticipants: 0,
     attendanceRate: 0,
     activeParticipants: 0,
   });
+  const [months, setMonths] = useState([]);
+  const [topAttendees, setTopAttendees] = useState([]);
 
   useEffect(() => {
     loadEvents();
@@ -32,54 +34,55 @@ export default function ReportsAnalytics() {
   }
 
   async function applyFilter() {
-    if (!selectedEvent || !startDate || !endDate) {
-      alert("Pilih acara dan periode terlebih dahulu");
-      return;
+    try {
+      const res = await monthlyAttendanceReport({
+        event_id: selectedEvent || null,
+        start_date: startDate || null,
+        end_date: endDate || null,
+      });
+      const report = res.data;
+
+      setSummary({
+        totalEvents: report.totals.events,
+        totalParticipants: report.totals.registered,
+        attendanceRate: Math.round((report.totals.attendance_rate ?? 0) * 100),
+        activeParticipants: report.totals.attendees,
+      });
+      setMonths(report.months);
+      setTopAttendees(report.top_attendees);
+    } catch (error) {
+      console.error("Error loading analytics:", error);
+      alert(error.response?.data?.detail?.message || "Gagal memuat laporan");
     }
-
-    // === Fetch Participants ===
-    const pRes = await fetchEventParticipants(selectedEvent);
-    const participants = pRes.data ?? pRes ?? [];
-
-    // === Fetch Attendance Report ===
-    const aRes = await attendanceReport({
-      event_id: selectedEvent,
-      start_date: startDate,
-      end_date: endDate,
-    });
-
-    const attendanceRows = aRes.data ?? aRes ?? [];
-
-    const totalParticipants = participants.length;
-    const totalPresent = attendanceRows.reduce(
-      (sum, r) => sum + r.attended_count,
-      0
-    );
-
-    const attendanceRate =
-      totalParticipants > 0
-        ? Math.round((totalPresent / totalParticipants) * 100)
-        : 0;
-
-    const activeParticipants = attendanceRows.length;
-
-    setSummary({
-      totalEvents: 1,
-      totalParticipants,
-      attendanceRate,
-      activeParticipants,
-    });
   }
 
-  const handleExportExcel = () => {
+  const handleExport = async (format) => {
     if (!selectedEvent) return alert("Pilih acara terlebih dahulu");
-    exportAttendanceExcel(selectedEvent, startDate, endDate);
+    if (exporting) return;
+
+    setExporting({ format, progress: 0 });
+    try {
+      await exportAttendanceReport(
+        {
+          format,
+          event_id: selectedEvent,
+          start_date: startDate || null,
+          end_date: endDate || null,
+        },
+        (job) => setExporting({ format, progress: job.progress ?? 0 })
+      );
+    } catch (error) {
+      console.error("Error exporting report:", error);
+      alert(error.response?.data?.detail || error.message || "Gagal membuat laporan");
+    } finally {
+      setExporting(null);
+    }
   };
 
-  const handleExportPDF = () => {
-    if (!selectedEvent) return alert("Pilih acara terlebih dahulu");
-    exportAttendancePDF(selectedEvent, startDate, endDate);
-  };
+  const exportLabel = (format, label) =>
+    exporting?.format === format
+      ? `Menyiapkan laporan… ${Math.round(exporting.progress * 100)}%`
+      : label;
 
   return (
     <div className="space-y-6 p-6">
@@ -90,14 +93,14 @@ export default function ReportsAnalytics() {
         <div className="text-lg font-semibold">
           {selectedEvent
             ? events.find((ev) => ev.id === selectedEvent)?.title
-            : "Pilih Acara"}
+            : "Semua Acara"}
         </div>
         <select
           className="p-2 rounded text-black"
           value={selectedEvent}
           onChange={(e) => setSelectedEvent(e.target.value)}
         >
-          <option value="">-- Pilih Acara --</option>
+          <option value="">-- Semua Acara --</option>
           {events.map((ev) => (
             <option key={ev.id} value={ev.id}>
               {ev.title}
@@ -154,6 +157,53 @@ export default function ReportsAnalytics() {
         />
       </div>
 
+      {/* Monthly Breakdown */}
+      {months.length > 0 && (
+        <div className="bg-white p-4 rounded-lg shadow overflow-x-auto">
+          <h3 className="font-bold text-lg mb-2">Kehadiran per Bulan</h3>
+          <table className="w-full text-sm">
+            <thead>
+              <tr className="text-left text-gray-600 border-b">
+                <th className="py-2">Bulan</th>
+                <th>Acara</th>
+                <th>Terdaftar</th>
+                <th>Hadir</th>
+                <th>Tingkat Kehadiran</th>
+                <th>Tidak Hadir</th>
+              </tr>
+            </thead>
+            <tbody>
+              {months.map((m) => (
+                <tr key={m.month} className="border-b last:border-0">
+                  <td className="py-2">{m.month}</td>
+                  <td>{m.events}</td>
+                  <td>{m.registered}</td>
+                  <td>{m.attendees}</td>
+                  <td>{formatRate(m.attendance_rate)}</td>
+                  <td>{formatRate(m.no_show_ratio)}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
+
+      {topAttendees.length > 0 && (
+        <div className="bg-white p-4 rounded-lg shadow">
+          <h3 className="font-bold text-lg mb-2">Peserta Paling Aktif</h3>
+          <ol className="space-y-1">
+            {topAttendees.map((t) => (
+              <li key={t.user_id} className="flex justify-between">
+                <span>{t.rank}. {t.full_name || "Nama tidak tersedia"}</span>
+                <span className="text-gray-600">
+                  {t.check_ins} kehadiran · {t.events_attended} acara
+                </span>
+              </li>
+            ))}
+          </ol>
+        </div>
+      )}
+
       {/* Report Buttons */}
       <div className="space-y-3 mt-4">
         <ReportButton label="Laporan Kehadiran Lengkap" />
@@ -161,23 +211,29 @@ export default function ReportsAnalytics() {
         <ReportButton label="Data Peserta Aktif" />
 
         <button
-          onClick={handleExportExcel}
-          className="w-full bg-indigo-700 text-white py-3 rounded-lg font-semibold flex items-center gap-2 justify-center"
+          onClick={() => handleExport("xlsx")}
+          disabled={!!exporting}
+          className="w-full bg-indigo-700 text-white py-3 rounded-lg font-semibold flex items-center gap-2 justify-center disabled:opacity-60"
         >
-          <FileSpreadsheet size={18} /> Export Semua Data (Excel)
+          <FileSpreadsheet size={18} /> {exportLabel("xlsx", "Export Semua Data (Excel)")}
         </button>
 
         <button
-          onClick={handleExportPDF}
-          className="w-full bg-red-600 text-white py-3 rounded-lg font-semibold flex items-center gap-2 justify-center"
+          onClick={() => handleExport("pdf")}
+          disabled={!!exporting}
+          className="w-full bg-red-600 text-white py-3 rounded-lg font-semibold flex items-center gap-2 justify-center disabled:opacity-60"
         >
-          <FileText size={18} /> Export Semua Data (PDF)
+          <FileText size={18} /> {exportLabel("pdf", "Export Semua Data (PDF)")}
         </button>
       </div>
     </div>
   );
 }
 
+function formatRate(rate) {
+  return rate == null ? "-" : `${Math.round(rate * 100)}%`;
+}
+
 function SummaryCard({ label, value }) {
   return (
     <div className="bg-white p-6 rounded-xl shadow text-center">
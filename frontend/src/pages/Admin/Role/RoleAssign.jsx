@@ -5,7 +5,7 @@ import {
   fetchEvents,
   fetchRoles,
   fetchEventParticipants,
-  assignRole
+  assignRolesBulk
 } from "../../../api"; 
 
 export default function RoleAssign() {
@@ -20,7 +20,8 @@ export default function RoleAssign() {
 
   const [selectedEvent, setSelectedEvent] = useState(eventIdFromState || "");
   const [selectedRole, setSelectedRole] = useState(roleId || "");
-  const [selectedParticipant, setSelectedParticipant] = useState("");
+  // Ticked participants; saved together with one assignRolesBulk call
+  const [selectedParticipants, setSelectedParticipants] = useState(new Set());
   const [searchQuery, setSearchQuery] = useState("");
 
   const [loading, setLoading] = useState(false);
@@ -81,6 +82,33 @@ export default function RoleAssign() {
     }
   }, [selectedEvent]);
 
+  // Start from whoever already holds the role, so unticking removes it
+  useEffect(() => {
+    setSelectedParticipants(
+      new Set(participants.filter((p) => selectedRole && p.role_id === selectedRole).map((p) => p.id))
+    );
+  }, [participants, selectedRole]);
+
+  const toggleParticipant = (participantId) => {
+    setSelectedParticipants((prev) => {
+      const next = new Set(prev);
+      if (next.has(participantId)) next.delete(participantId);
+      else next.add(participantId);
+      return next;
+    });
+  };
+
+  // participant_id -> role_id for every change, null where the role is taken away
+  const pendingAssignments = () => {
+    const assignments = {};
+    for (const p of participants) {
+      const ticked = selectedParticipants.has(p.id);
+      if (ticked && p.role_id !== selectedRole) assignments[p.id] = selectedRole;
+      if (!ticked && p.role_id === selectedRole) assignments[p.id] = null;
+    }
+    return assignments;
+  };
+
   // Filter participants based on search
   const filteredParticipants = participants.filter((p) => {
     const name = p.user?.full_name || p.name || "";
@@ -92,17 +120,19 @@ export default function RoleAssign() {
 
     if (!selectedEvent) return setMessage("Pilih acara wajib diisi.");
     if (!selectedRole) return setMessage("Pilih peran wajib diisi.");
-    if (!selectedParticipant) return setMessage("Pilih peserta wajib diisi.");
+    const assignments = pendingAssignments();
+    if (Object.keys(assignments).length === 0) return setMessage("Tidak ada perubahan penugasan.");
 
-    if (!window.confirm("Tugaskan peran ini kepada peserta terpilih?")) {
+    if (!window.confirm("Simpan penugasan peran untuk peserta terpilih?")) {
       return;
     }
 
     try {
       setLoading(true);
 
-      // Call API to assign role
-      await assignRole(selectedParticipant, selectedRole);
+      // One request for every ticked and unticked participant
+      const updated = await assignRolesBulk(assignments);
+      setParticipants(updated.filter((p) => p.event_id === selectedEvent));
 
       setMessage("Peran berhasil ditugaskan!");
       
@@ -113,7 +143,6 @@ export default function RoleAssign() {
         }, 1500);
       } else {
         // Reset form for new assignment
-        setSelectedParticipant("");
         setSearchQuery("");
       }
     } catch (err) {
@@ -230,7 +259,8 @@ export default function RoleAssign() {
 
         <div className="space-y-2 max-h-96 overflow-y-auto">
           {filteredParticipants.map((p) => {
-            const hasRole = Boolean(p.role_id);
+            const hasRole = Boolean(p.role_id) && p.role_id !== selectedRole;
+            const ticked = selectedParticipants.has(p.id);
             const name = p.user?.full_name || p.name || "Peserta";
             const phone = p.user?.phone || p.phone || "";
             
@@ -238,15 +268,14 @@ export default function RoleAssign() {
               <label
                 key={p.id}
                 className={`flex items-center gap-3 p-3 border rounded cursor-pointer hover:bg-gray-50 ${
-                  selectedParticipant === p.id ? "bg-blue-50 border-blue-400" : ""
+                  ticked ? "bg-blue-50 border-blue-400" : ""
                 }`}
               >
                 <input
-                  type="radio"
-                  name="selectedParticipant"
+                  type="checkbox"
                   value={p.id}
-                  checked={selectedParticipant === p.id}
-                  onChange={() => setSelectedParticipant(p.id)}
+                  checked={ticked}
+                  onChange={() => toggleParticipant(p.id)}
                 />
                 <div className="flex-1">
                   <div className="font-medium">{name}</div>
@@ -275,9 +304,9 @@ export default function RoleAssign() {
         <button
           className="px-4 py-2 rounded text-white bg-blue-600 hover:bg-blue-700 disabled:bg-gray-400 disabled:cursor-not-allowed"
           onClick={handleAssign}
-          disabled={loading || !selectedEvent || !selectedRole || !selectedParticipant}
+          disabled={loading || !selectedEvent || !selectedRole}
         >
-          {loading ? "Memproses..." : "Tugaskan Peran"}
+          {loading ? "Memproses..." : `Tugaskan Peran (${selectedParticipants.size})`}
         </button>
       </div>
 
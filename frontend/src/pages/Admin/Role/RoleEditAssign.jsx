@@ -4,14 +4,16 @@ import {
   fetchEventRoles,
   fetchEventParticipants,
   fetchAllUsers,
-  assignRole,
-  unassignRole
+  assignRolesBulk
 } from "../../../api";
 
 export default function RoleEditAssign() {
   const [events, setEvents] = useState([]);
   const [roles, setRoles] = useState([]);
-  const [assignments, setAssignments] = useState([]);
+  // Every participant of the event; the role filter is applied below
+  const [participants, setParticipants] = useState([]);
+  // participant_id -> role_id (null removes), sent in one assignRolesBulk call
+  const [pending, setPending] = useState({});
   const [allUsers, setAllUsers] = useState([]);
 
   const [selectedEvent, setSelectedEvent] = useState("");
@@ -36,22 +38,32 @@ export default function RoleEditAssign() {
       fetchEventRoles(selectedEvent).then(setRoles);
     } else {
       setRoles([]);
-      setAssignments([]);
     }
+    setPending({});
   }, [selectedEvent]);
 
   useEffect(() => {
-    if (selectedEvent && selectedRole) {
-      fetchEventParticipants(selectedEvent, selectedRole).then(setAssignments);
+    if (selectedEvent) {
+      fetchEventParticipants(selectedEvent).then(setParticipants);
     } else {
-      setAssignments([]);
+      setParticipants([]);
     }
-  }, [selectedRole]);
+  }, [selectedEvent]);
+
+  const roleOf = (p) => (p.id in pending ? pending[p.id] : p.role_id);
+
+  const assignments = selectedRole
+    ? participants.filter((p) => roleOf(p) === selectedRole)
+    : [];
 
   const filteredAssignments = assignments.filter((p) =>
-    p.name?.toLowerCase().includes(searchQuery.toLowerCase())
+    p.user_full_name?.toLowerCase().includes(searchQuery.toLowerCase())
   );
 
+  const stage = (participantId, roleId) => {
+    setPending((prev) => ({ ...prev, [participantId]: roleId }));
+  };
+
   const findUserByPhone = () => {
     const found = allUsers.find((u) => u.phone === manualPhone);
     if (found) {
@@ -63,7 +75,8 @@ export default function RoleEditAssign() {
     }
   };
 
-  const handleReassign = async () => {
+  // Queue the chosen villager for this role; saved by handleSave
+  const handleReassign = () => {
     setMessage("");
 
     if (!selectedEvent) return setMessage("Pilih acara wajib diisi.");
@@ -74,38 +87,41 @@ export default function RoleEditAssign() {
       return setMessage("Pilih peserta baru atau masukkan manual.");
     }
 
-    try {
-      setLoading(true);
+    const participant = participants.find((p) => p.user_id === chosenUser);
+    if (!participant) {
+      return setMessage("Pengguna belum terdaftar di acara ini.");
+    }
 
-      await assignRole(selectedRole, {
-        pengguna_id: chosenUser,
-        acara_id: selectedEvent
-      });
+    stage(participant.id, selectedRole);
+    setSelectedUser("");
+    setManualUser("");
+    setManualPhone("");
+  };
 
-      setMessage("Penugasan berhasil diperbarui!");
+  const handleUnassign = (participantId) => {
+    stage(participantId, null);
+  };
 
-      fetchEventParticipants(selectedEvent, selectedRole).then(setAssignments);
+  const handleSave = async () => {
+    setMessage("");
 
-      setSelectedUser("");
-      setManualUser("");
-      setManualPhone("");
-    } catch (err) {
-      console.error(err);
-      setMessage("Gagal memperbarui penugasan.");
-    } finally {
-      setLoading(false);
+    if (Object.keys(pending).length === 0) {
+      return setMessage("Tidak ada perubahan penugasan.");
     }
-  };
 
-  const handleUnassign = async (participantId) => {
     try {
-      await unassignRole(participantId);
-      setMessage("Penugasan dihapus.");
+      setLoading(true);
 
-      fetchEventParticipants(selectedEvent, selectedRole).then(setAssignments);
+      const updated = await assignRolesBulk(pending);
+      setParticipants(updated.filter((p) => p.event_id === selectedEvent));
+      setPending({});
+
+      setMessage("Penugasan berhasil diperbarui!");
     } catch (err) {
       console.error(err);
-      setMessage("Gagal menghapus penugasan.");
+      setMessage("Gagal memperbarui penugasan.");
+    } finally {
+      setLoading(false);
     }
   };
 
@@ -165,11 +181,11 @@ export default function RoleEditAssign() {
                 className="flex justify-between items-center p-3 border rounded"
               >
                 <span>
-                  {p.name} ({p.phone})
+                  {p.user_full_name} ({p.user_phone})
                 </span>
                 <button
                   className="px-3 py-1 bg-red-500 text-white rounded"
-                  onClick={() => handleUnassign(p.participantId)}
+                  onClick={() => handleUnassign(p.id)}
                 >
                   Hapus
                 </button>
@@ -227,19 +243,28 @@ export default function RoleEditAssign() {
             </button>
           </div>
         </div>
+
+        <button
+          className="mt-4 px-4 py-2 rounded bg-gray-300"
+          onClick={handleReassign}
+        >
+          Tambahkan ke Peran
+        </button>
       </div>
 
       {/* Buttons */}
       <div className="flex justify-end gap-3 pt-4">
-        <button className="px-4 py-2 rounded bg-gray-300">Batal</button>
+        <button className="px-4 py-2 rounded bg-gray-300" onClick={() => setPending({})}>
+          Batal
+        </button>
 
         <button
           className="px-4 py-2 rounded text-white"
           style={{ backgroundColor: "#4C68D5" }}
-          onClick={handleReassign}
+          onClick={handleSave}
           disabled={loading}
         >
-          {loading ? "Memproses..." : "Perbarui Penugasan"}
+          {loading ? "Memproses..." : `Perbarui Penugasan (${Object.keys(pending).length})`}
         </button>
       </div>
     </div>
@@ -118,7 +118,8 @@ export default function RoleManagement() {
 
   // Counts
   const totalRoles = merged.length;
-  const filledRoles = merged.filter((r) => r.assigned_to).length;
+  // slots_filled comes from the roles endpoint
+  const filledRoles = merged.filter((r) => r.slots_filled >= r.slots_required).length;
   const emptyRoles = totalRoles - filledRoles;
 
   // ---------------------------------------------
@@ -135,14 +136,18 @@ export default function RoleManagement() {
     try {
       await unassignRole(participantId);
 
-      // Refresh participant state
-      const pRes = await fetchEventParticipants(selectedEvent);
+      // Refresh participant state and role fill counts
+      const [pRes, rolesRes] = await Promise.all([
+        fetchEventParticipants(selectedEvent),
+        fetchRoles(selectedEvent),
+      ]);
       const backendParticipants = Array.isArray(pRes) 
         ? pRes 
         : Array.isArray(pRes.data) 
         ? pRes.data 
         : [];
       setParticipants(backendParticipants);
+      setRoles(Array.isArray(rolesRes) ? rolesRes : rolesRes.data ?? []);
     } catch (err) {
       console.error(err);
       alert("Gagal menghapus penugasan.");
@@ -241,7 +246,7 @@ export default function RoleManagement() {
                         <FiEdit2 className="text-blue-600 text-xl" />
                       </button>
                       <span className="px-3 py-1 bg-gray-200 rounded text-sm">
-                        {role.assigned_to ? "1/1" : "0/1"}
+                        {role.slots_filled ?? 0}/{role.slots_required}
                       </span>
                     </div>
                   </div>
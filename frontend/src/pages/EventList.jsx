@@ -10,47 +10,29 @@ import { Text } from "../components/ui";
 
 export default function EventList() {
   const [events, setEvents] = useState([]);
-  const [filtered, setFiltered] = useState([]);
   const [query, setQuery] = useState("");
   const [loading, setLoading] = useState(true);
 
+  // Upcoming filter and search run on the server; debounce typing
   useEffect(() => {
-    async function load() {
+    const handle = setTimeout(async () => {
+      setLoading(true);
       try {
-        const res = await fetchEvents();
-        if (res.success) {
-          const now = new Date();
-
-          const sorted = res.data
-            .filter((e) => {
-              if (!e.event_date) return false;
-              const date = new Date(e.event_date);
-              return !e.is_cancelled && date >= now;
-            })
-            .sort(
-              (a, b) =>
-                new Date(a.event_date) - new Date(b.event_date)
-            );
+        const params = { upcoming: true };
+        if (query.trim()) params.q = query.trim();
 
-          setEvents(sorted);
-          setFiltered(sorted);
+        const res = await fetchEvents(params);
+        if (res.success) {
+          setEvents(res.data.filter((e) => e.event_date && !e.is_cancelled));
         }
       } catch (err) {
         console.error(err);
       }
       setLoading(false);
-    }
-    load();
-  }, []);
+    }, 300);
 
-  useEffect(() => {
-    if (!query.trim()) {
-      setFiltered(events);
-      return;
-    }
-    const q = query.toLowerCase();
-    setFiltered(events.filter((e) => e.title.toLowerCase().includes(q)));
-  }, [query, events]);
+    return () => clearTimeout(handle);
+  }, [query]);
 
   return (
     <div className="min-h-screen flex flex-col bg-gray-50">
@@ -74,12 +56,12 @@ export default function EventList() {
           <div className="mt-8 flex flex-col gap-6 pb-16">
             {loading && <Text color="muted">Memuat acara...</Text>}
 
-            {!loading && filtered.length === 0 && (
+            {!loading && events.length === 0 && (
               <Text color="muted">Tidak ada acara ditemukan.</Text>
             )}
 
             {!loading &&
-              filtered.map((event) => (
+              events.map((event) => (
                 <EventCard key={event.id} event={event} />
               ))}
           </div>